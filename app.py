@@ -1,21 +1,22 @@
 import streamlit as st
 import os
-import tempfile
-import moviepy.editor as mp
-import speech_recognition as sr
-from groq import Groq
-import requests
 import json
 import uuid
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from dotenv import load_dotenv
-import re
 import base64
-
-# Load environment variables (e.g., GROQ_API_KEY)
-load_dotenv()
+import time
+import threading
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pipeline import (add_comments_to_code, APP_CACHE_DIR, ARCHIVE_PAGE_SIZE, AudioDecodeError,
+    benchmark_transcription_backend, build_chat_index, chatbot_response_stream, comment_syntax, EMAIL_SUBJECT,
+    extract_asana_project_id, extract_audio, get_http_session, get_llm_cache, get_telemetry, get_llm_latency_log,
+    get_meeting_archive, get_repo_file_cache, get_transcription_backend, GITHUB_API_URL, group_feedback_by_file,
+    measure_connection_reuse, PipelineProgress, startup_profile, process_all_asana_tasks, publish_pull_request_review,
+    publish_review_commit, render_email_parts, render_summary_email, run_processing_job, send_summary_emails,
+    TRANSCRIPTION_BACKEND, TRANSCRIPTION_BACKENDS, TranscriptionError, update_github_comments,
+    validate_asana_credentials)
+
+SCRIPT_STARTED = time.perf_counter()
 
 # Set page configuration
 st.set_page_config(page_title="AI Code Review Summarizer", layout="wide")
@@ -25,8 +26,6 @@ st.title("AI-Powered Code Review Summarizer")
 st.write("Upload meeting recordings/documents and integrate with GitHub, Asana, and Email for actionable insights.")
 
 # Session state initialization
-if 'meeting_archive' not in st.session_state:
-    st.session_state['meeting_archive'] = []
 if 'processing_complete' not in st.session_state:
     st.session_state['processing_complete'] = False
 if 'extracted_text' not in st.session_state:
@@ -39,476 +38,218 @@ if 'asana_tasks_created' not in st.session_state:
     st.session_state['asana_tasks_created'] = []
 if 'github_files_content' not in st.session_state:
     st.session_state['github_files_content'] = {}
+if 'github_file_index' not in st.session_state:
+    st.session_state['github_file_index'] = {}
+if 'github_files_snapshot' not in st.session_state:
+    st.session_state['github_files_snapshot'] = None
+if 'analysis_segments' not in st.session_state:
+    # {segment_key: analysis} of the current meeting, for incremental re-analysis
+    st.session_state['analysis_segments'] = {}
+if 'active_jobs' not in st.session_state:
+    # Jobs are listed in the URL, so a browser refresh picks them up again
+    job_param = st.experimental_get_query_params().get('jobs', [''])[0]
+    st.session_state['active_jobs'] = [job_id for job_id in job_param.split(',') if job_id]
 
 # --------------------------------------------------------------------
-# GitHub Integration Functions
+# Session Helpers
 # --------------------------------------------------------------------
 
-def get_github_files(repo_url, branch, github_token):
-    """
-    Fetch file content from a GitHub repository.
-    Handles duplicate file names by using full relative paths.
-    """
-    clean_url = repo_url.rstrip('/')
-    if clean_url.endswith('.git'):
-        clean_url = clean_url[:-4]
-
-    repo_parts = clean_url.split('github.com/')[-1].split('/')
-    if len(repo_parts) < 2:
-        return None, "Invalid GitHub URL format"
-
-    owner, repo = repo_parts[0], repo_parts[1]
-    headers = {}
-    if github_token:
-        headers["Authorization"] = f"token {github_token}"
-
-    files_dict = {}
-    excluded_dirs = ["node_modules", ".git", "pycache", "dist", "build"]
-    excluded_extensions = [".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".woff", ".ttf"]
-
-    def is_excluded_file(path):
-        for dir_name in excluded_dirs:
-            if f"/{dir_name}/" in path or path.startswith(f"{dir_name}/"):
-                return True
-        for ext in excluded_extensions:
-            if path.endswith(ext):
-                return True
-        return False
-
-    def process_contents(path=""):
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-        if branch:
-            url += f"?ref={branch}"
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            contents = response.json()
-            if isinstance(contents, list):
-                for item in contents:
-                    if item["type"] == "file" and not is_excluded_file(item["path"]):
-                        file_response = requests.get(item["download_url"], headers=headers)
-                        files_dict[item["path"]] = file_response.text
-                    elif item["type"] == "dir" and not is_excluded_file(item["path"]):
-                        process_contents(item["path"])
-            elif isinstance(contents, dict) and contents["type"] == "file":
-                file_response = requests.get(contents["download_url"], headers=headers)
-                files_dict[contents["path"]] = file_response.text
-        except requests.exceptions.RequestException as e:
-            if "404" in str(e):
-                return None, f"Repository not found: {owner}/{repo}"
-            return None, f"GitHub API error: {str(e)}"
-
-    try:
-        process_contents()
-        return files_dict, None
-    except Exception as e:
-        return None, f"Error fetching repository: {str(e)}"
-
-def update_github_comments(repo_url, branch, github_token, comment_body):
-    """
-    Update GitHub with meeting insights.
-    This function creates an issue with the meeting summary.
-    """
-    clean_url = repo_url.rstrip('/')
-    if clean_url.endswith('.git'):
-        clean_url = clean_url[:-4]
-    repo_parts = clean_url.split('github.com/')[-1].split('/')
-    if len(repo_parts) < 2:
-        return False
-    owner, repo = repo_parts[0], repo_parts[1]
-
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    if github_token:
-        headers["Authorization"] = f"token {github_token}"
-
-    # Create an issue with the meeting summary
-    url = f"https://api.github.com/repos/{owner}/{repo}/issues"
-    data = {
-        "title": "Automated Code Review Meeting Summary",
-        "body": comment_body
-    }
-    response = requests.post(url, headers=headers, json=data)
-    return response.status_code == 201
-
-def add_comments_to_code(file_content, feedback_items):
-    """
-    Add review comments to code file based on feedback items.
-    Returns the updated file content with comments inserted.
-    """
-    if not feedback_items or not file_content:
-        return file_content
-
-    # Convert file content to a list of lines for processing
-    lines = file_content.split('\n')
-
-    # Sort feedback by line number (descending) so we can insert from bottom up
-    # This prevents line numbers from shifting as we add comments
-    sorted_feedback = sorted(
-        feedback_items,
-        key=lambda x: int(str(x.get('line_number', '0')).split('-')[0]) if isinstance(x.get('line_number'), (int, str)) else 0,
-        reverse=True
-    )
-
-    for item in sorted_feedback:
-        # Handle line number which could be a single number or range (e.g., "10-15")
-        line_ref = item.get('line_number', '')
-        if not line_ref:
-            continue
-
-        # Parse line reference
-        if isinstance(line_ref, int):
-            # Simple integer line number
-            line_num = line_ref
-            insert_at = line_num
-        elif isinstance(line_ref, str):
-            if '-' in line_ref:
-                # Line range (e.g., "10-15")
-                try:
-                    start, end = map(int, line_ref.split('-'))
-                    # Insert comment before the range
-                    line_num = start
-                    insert_at = line_num
-                except ValueError:
-                    # If parsing fails, skip this item
-                    continue
-            else:
-                # Single line as string
-                try:
-                    line_num = int(line_ref)
-                    insert_at = line_num
-                except ValueError:
-                    # If parsing fails, skip this item
-                    continue
-        else:
-            # Unexpected type
-            continue
+def active_llm_cache():
+    """The LLM cache for this session, or None when the sidebar bypass switch is on."""
+    if st.session_state.get('llm_cache_bypass'):
+        return None
+    return get_llm_cache()
 
-        # Adjust line number to zero-based index
-        insert_at = max(0, min(insert_at - 1, len(lines)))
+# --------------------------------------------------------------------
+# Background Jobs
+# --------------------------------------------------------------------
 
-        # Prepare comment text
-        comment_text = f"// CODE REVIEW: {item.get('issue', '')}"
-        recommendation = item.get('recommendation', '')
-        if recommendation:
-            comment_text += f"\n// RECOMMENDATION: {recommendation}"
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = 1.0
+JOB_PROGRESS_INTERVAL = 0.5
+JOB_OUTPUT_TTL_SECONDS = 3600
+
+class JobStore:
+    """SQLite table of processing jobs, so status and results outlive reruns and page reloads."""
+
+    COLUMNS = ("status", "stage", "progress", "detail", "partial", "params", "result", "error")
+    JSON_COLUMNS = ("partial", "params", "result")
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY, status TEXT, stage TEXT, progress REAL, detail TEXT, partial TEXT,
+            params TEXT, result TEXT, error TEXT, created REAL, updated REAL)""")
+        # Inputs live in memory only, so jobs in flight when the server stopped cannot be resumed
+        self._db.execute("UPDATE jobs SET status = 'interrupted', updated = ? WHERE status IN ('queued', 'running')",
+                         (time.time(),))
+        self._db.commit()
+
+    def create(self, params):
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT INTO jobs (id, status, stage, progress, params, created, updated) "
+                             "VALUES (?, 'queued', 'queued', 0, ?, ?, ?)", (job_id, json.dumps(params), now, now))
+            self._db.commit()
+        return job_id
+
+    def update(self, job_id, **fields):
+        columns = [c for c in fields if c in self.COLUMNS]
+        values = [json.dumps(fields[c]) if c in self.JSON_COLUMNS else fields[c] for c in columns]
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {', '.join(f'{c} = ?' for c in columns)}, updated = ? WHERE id = ?",
+                             values + [time.time(), job_id])
+            self._db.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            cursor = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            names = [d[0] for d in cursor.description]
+        if row is None:
+            return None
+        job = dict(zip(names, row))
+        for column in self.JSON_COLUMNS:
+            job[column] = json.loads(job[column]) if job[column] else None
+        return job
+
+class JobProgress(PipelineProgress):
+    """Handle passed to a running job for reporting its stage, partial output and warnings."""
+
+    def __init__(self, store, job_id):
+        super().__init__()
+        self.store = store
+        self.job_id = job_id
+        self._partial = {}
+        self._last_write = 0.0
+
+    def stage(self, name, progress, detail="", throttle=False):
+        if throttle and time.perf_counter() - self._last_write < JOB_PROGRESS_INTERVAL:
+            return
+        self._last_write = time.perf_counter()
+        self.store.update(self.job_id, stage=name, progress=progress, detail=detail)
 
-        code_suggestion = item.get('code_suggestion', '')
-        if code_suggestion:
-            # Format the code suggestion as a comment
-            code_lines = code_suggestion.strip().split('\n')
-            comment_text += "\n// SUGGESTED CODE:"
-            for code_line in code_lines:
-                comment_text += f"\n// {code_line}"
+    def partial(self, **values):
+        self._partial.update(values)
+        if time.perf_counter() - self._last_write >= JOB_PROGRESS_INTERVAL:
+            self._last_write = time.perf_counter()
+            self.store.update(self.job_id, partial=self._partial)
 
-        # Insert comment before the specified line
-        lines.insert(insert_at, comment_text)
+class JobRunner:
+    """
+    Runs processing jobs on a bounded thread pool outside the Streamlit script thread.
+    Each stage is network or subprocess bound, so threads overlap well. The fetched
+    repository files and their index are kept in memory (too large for the job table)
+    until collected.
+    """
 
-    # Join lines back together
-    return '\n'.join(lines)
+    def __init__(self, store, max_workers):
+        self.store = store
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._files = {}
+        self._lock = threading.Lock()
 
-# --------------------------------------------------------------------
-# Utility Functions
-# --------------------------------------------------------------------
+    def submit(self, params, inputs):
+        job_id = self.store.create(params)
+        self.executor.submit(self._run, job_id, inputs)
+        return job_id
 
-def extract_audio(file):
-    """Extract and convert audio from a video or audio file to a PCM-compatible WAV."""
-    temp_source_path = None
-    try:
-        file_extension = file.name.split('.')[-1].lower()
-        with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False) as temp_file:
-            temp_file.write(file.read())
-            temp_source_path = temp_file.name
-
-        if file_extension == 'mp4':
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-                video = mp.VideoFileClip(temp_source_path)
-                video.audio.write_audiofile(temp_audio.name, verbose=False, logger=None)
-                video.close()
-                audio_path = temp_audio.name
-        elif file_extension == 'mp3':
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-                audio_clip = mp.AudioFileClip(temp_source_path)
-                audio_clip.write_audiofile(temp_audio.name, verbose=False, logger=None)
-                audio_clip.close()
-                audio_path = temp_audio.name
-        elif file_extension == 'wav':
-            audio_path = temp_source_path
-            temp_source_path = None
-        else:
-            raise ValueError("Unsupported file format. Use mp4, mp3, or wav.")
-        return audio_path
-    except Exception as e:
-        st.error(f"Error extracting audio: {str(e)}")
-        return None
-    finally:
-        if temp_source_path and os.path.exists(temp_source_path):
-            try:
-                os.unlink(temp_source_path)
-            except Exception as cleanup_error:
-                st.error(f"Error cleaning up source file: {cleanup_error}")
-
-def speech_to_text(audio_path):
-    """Convert audio to text and delete the audio file afterwards."""
-    if not audio_path:
-        return ""
-    recognizer = sr.Recognizer()
-    try:
-        with sr.AudioFile(audio_path) as source:
-            recognizer.adjust_for_ambient_noise(source)
-            audio_data = recognizer.record(source)
-            try:
-                text = recognizer.recognize_google(audio_data)
-                return text
-            except sr.UnknownValueError:
-                return "[inaudible]"
-            except sr.RequestError as e:
-                st.error(f"Speech recognition error: {e}")
-                return ""
-    finally:
-        if os.path.exists(audio_path):
-            try:
-                os.unlink(audio_path)
-            except Exception as cleanup_error:
-                st.error(f"Error cleaning up audio file: {cleanup_error}")
-
-def analyze_with_groq(text, files_dict=None):
-    """Analyze text using Groq API."""
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    file_list = "\n".join(files_dict.keys()) if files_dict else "No files provided."
-    prompt = f"""
-Analyze this code review meeting transcript:
-{text}
-
-GitHub files: {file_list}
-
-Provide:
-1. A summary
-2. Action items (task, assignee)
-3. Code feedback (file, feedback, line_number, recommendation, code_suggestion)
-4. Decisions
-
-Return JSON:
-{{
-    "summary": "...",
-    "action_items": [{{"task": "...", "assignee": "..."}}],
-    "code_feedback": [
-        {{
-            "file": "file_path",
-            "feedback": "...",
-            "line_number": "...",
-            "recommendation": "...",
-            "code_suggestion": "..."
-        }}
-    ],
-    "decisions": ["..."]
-}}
-"""
-    try:
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=2500,
-            temperature=0.5
-        )
-        raw_response = response.choices[0].message.content
-        return json.loads(raw_response)
-    except json.JSONDecodeError:
-        # Try to extract JSON from text (in case model adds commentary)
+    def _run(self, job_id, inputs):
+        self.store.update(job_id, status="running")
+        progress = JobProgress(self.store, job_id)
         try:
-            json_start = raw_response.find('{')
-            json_end = raw_response.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                extracted_json = raw_response[json_start:json_end]
-                return json.loads(extracted_json)
-        except:
-            pass
-
-        st.error("Failed to parse Groq response.")
-        return {"summary": raw_response if 'raw_response' in locals() else "",
-                "action_items": [],
-                "code_feedback": [],
-                "decisions": []}
-    except Exception as e:
-        st.error(f"Groq API error: {e}")
-        return {"summary": "Analysis failed.", "action_items": [], "code_feedback": [], "decisions": []}
-
-def chatbot_response(query, summary_data):
-    """Generate chatbot response using Groq and summary data."""
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    context = json.dumps(summary_data, indent=2)
-    prompt = f"""
-Based on this meeting summary:
-{context}
-
-Answer this question: {query}
-"""
-    try:
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=500,
-            temperature=0.5
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Chatbot error: {e}")
-        return "Sorry, I couldn't process your request."
-
-def send_email(smtp_server, smtp_port, sender_email, sender_password, recipients, summary_data):
-    """Send meeting summary via email using provided SMTP credentials."""
-    msg = MIMEMultipart()
-    msg['Subject'] = "Code Review Meeting Summary"
-    msg['From'] = sender_email
-    msg['To'] = ", ".join(recipients)
-    body = f"""
-    <h2>Meeting Summary</h2>
-    <p>{summary_data.get('summary', 'No summary available')}</p>
-    <h3>Action Items</h3>
-    <ul>
-        {''.join([f'<li>{item["task"]} (Assignee: {item["assignee"]})</li>' for item in summary_data.get('action_items', [])])}
-    </ul>
-    """
-    msg.attach(MIMEText(body, 'html'))
-    try:
-        with smtplib.SMTP(smtp_server, int(smtp_port)) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-        return True
-    except Exception as e:
-        st.error(f"Email failed: {e}")
-        return False
+            result, files_dict, file_index = run_processing_job(progress, inputs)
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e), partial=progress._partial)
+            return
+        with self._lock:
+            now = time.time()
+            self._files = {k: v for k, v in self._files.items() if now - v[0] < JOB_OUTPUT_TTL_SECONDS}
+            self._files[job_id] = (now, files_dict, file_index)
+        self.store.update(job_id, status="done", stage="done", progress=1.0, detail="", result=result)
+
+    def take_files(self, job_id):
+        """Collect a finished job's (files_dict, file_index)."""
+        with self._lock:
+            return self._files.pop(job_id, (None, {}, {}))[1:]
+
+@st.cache_resource
+def get_job_runner():
+    """Process-wide job runner shared by every session."""
+    return JobRunner(JobStore(os.path.join(APP_CACHE_DIR, "jobs.sqlite3")), JOB_WORKERS)
 
 # --------------------------------------------------------------------
-# Asana Functions (Improved)
+# UI Functions
 # --------------------------------------------------------------------
 
-def extract_asana_project_id(project_url):
-    """Extract project ID from Asana URL."""
-    # Extract ID from URLs like: https://app.asana.com/0/1209864167784857/1209864173573367
-    pattern = r'asana\.com/\d+/(\d+)'
-    matches = re.search(pattern, project_url)
-    if matches:
-        return matches.group(1)
-    return project_url  # Return as-is if no match (might be direct ID)
-
-def validate_asana_credentials(asana_pat, project_id):
-    """Validate Asana credentials by making a test API call."""
-    if not asana_pat or not project_id:
-        return False, "Missing Asana PAT or Project ID"
-
-    headers = {
-        'Authorization': f'Bearer {asana_pat}',
-        'Accept': 'application/json'
-    }
-
-    # Try to get project details to validate credentials and project ID
-    url = f'https://app.asana.com/api/1.0/projects/{project_id}'
-    try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return True, "Validated successfully"
-        elif response.status_code == 401:
-            return False, "Invalid Asana Personal Access Token"
-        elif response.status_code == 404:
-            return False, "Project not found. Please check the Project ID"
-        else:
-            return False, f"Asana API error: {response.status_code}"
-    except Exception as e:
-        return False, f"Connection error: {str(e)}"
-
-def get_asana_users(asana_pat, workspace_gid):
-    """Get list of users in an Asana workspace to map assignees."""
-    headers = {
-        'Authorization': f'Bearer {asana_pat}',
-        'Accept': 'application/json'
-    }
-
-    url = f'https://app.asana.com/api/1.0/workspaces/{workspace_gid}/users'
-    try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            users = response.json().get('data', [])
-            return {user['name'].lower(): user['gid'] for user in users}
-        return {}
-    except Exception:
-        return {}
-
-def get_workspace_from_project(asana_pat, project_id):
-    """Get workspace GID from project ID."""
-    headers = {
-        'Authorization': f'Bearer {asana_pat}',
-        'Accept': 'application/json'
-    }
-
-    url = f'https://app.asana.com/api/1.0/projects/{project_id}'
-    try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json().get('data', {}).get('workspace', {}).get('gid')
-        return None
-    except Exception:
-        return None
-
-def create_asana_task(asana_pat, project_id, task_name, task_notes=None, assignee_name=None):
-    url = 'https://app.asana.com/api/1.0/tasks'
-    headers = {
-        'Authorization': f'Bearer {asana_pat}',
-        'Content-Type': 'application/json'
-    }
-
-    payload = {
-        "data": {
-            "name": task_name,
-            "notes": task_notes or "",
-            "projects": [project_id]
-        }
-    }
-
-    if assignee_name and assignee_name.strip().lower() not in ['', 'n/a', 'none', 'unassigned']:
-        workspace_gid = get_workspace_from_project(asana_pat, project_id)
-        if workspace_gid:
-            users = get_asana_users(asana_pat, workspace_gid)
-            assignee_name_lower = assignee_name.strip().lower()
-            for name, gid in users.items():
-                if assignee_name_lower in name:
-                    payload["data"]["assignee"] = gid
-                    break
-
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response_data = response.json()
-        if response.status_code in [200, 201]:
-            task_data = response_data.get('data', {})
-            return True, task_data.get('gid', 'unknown')
+def render_analysis_preview(placeholder, data):
+    """Show the sections of an analysis that has arrived so far."""
+    with placeholder.container():
+        st.caption("Analysis in progress...")
+        if data.get('summary'):
+            st.markdown(f"**Summary:** {data['summary']}")
+        for key, title in (("action_items", "Action items"), ("code_feedback", "Code feedback"), ("decisions", "Decisions")):
+            items = data.get(key) or []
+            if items:
+                st.markdown(f"**{title}** ({len(items)})")
+                for item in items:
+                    if isinstance(item, dict):
+                        st.write(f"- {item.get('task') or item.get('feedback') or ''}"
+                                 + (f" ({item['assignee']})" if item.get('assignee') else "")
+                                 + (f" — {item['file']}" if item.get('file') else ""))
+                    else:
+                        st.write(f"- {item}")
+
+def load_job_result(job_id, result, params):
+    """Make a finished job's output the current meeting in this session and archive it."""
+    for warning in result.get('warnings') or []:
+        st.warning(warning)
+    st.session_state['analysis_token_usage'] = result['token_usage']
+    st.session_state['repo_fetch_info'] = result['fetch']
+    st.session_state['pipeline_timings'] = result['timings']
+    st.session_state['trace_id'] = result.get('trace_id')
+    st.session_state['extracted_text'] = result['text']
+    st.session_state['summary_data'] = result['summary_data']
+    st.session_state['analysis_segments'] = result.get('segments') or {}
+    st.session_state['github_files_content'], st.session_state['github_file_index'] = \
+        get_job_runner().take_files(job_id)
+    st.session_state['github_files_snapshot'] = (result['fetch'] or {}).get('snapshot')
+    st.session_state['github_files_source'] = (params.get('repo_url'), params.get('branch'))
+    st.session_state['processing_complete'] = True
+    st.session_state['meeting_id'] = job_id
+    get_meeting_archive().save(job_id, result['text'], result['summary_data'], params.get('repo_url'),
+                               params.get('source'))
+
+def render_jobs():
+    """Show this session's processing jobs and collect the results of finished ones."""
+    store = get_job_runner().store
+    for job_id in list(st.session_state['active_jobs']):
+        job = store.get(job_id)
+        if job is None:
+            st.session_state['active_jobs'].remove(job_id)
+            continue
+        label = f"{job['params']['source']}" + (f" + {job['params']['repo_url']}" if job['params'].get('repo_url') else "")
+        if job['status'] == 'done':
+            load_job_result(job_id, job['result'], job['params'])
+            st.session_state['active_jobs'].remove(job_id)
+            st.success(f"Processing complete! ({label})")
+        elif job['status'] in ('failed', 'interrupted'):
+            st.session_state['active_jobs'].remove(job_id)
+            st.error(f"Processing {job['status']} ({label}): {job['error'] or 'the server restarted'}")
         else:
-            error_msg = response_data.get('errors', [{}])[0].get('message', 'Unknown error')
-            return False, f"Asana API error: {error_msg}"
-    except Exception as e:
-        return False, f"Asana API exception: {str(e)}"
-
-def process_all_asana_tasks(asana_pat, project_id, action_items):
-    """Process all action items as Asana tasks in batch."""
-    results = []
-    for item in action_items:
-        task_name = item.get('task', 'Untitled Task')
-        assignee = item.get('assignee', '')
-        task_notes = f"Assignee: {assignee}\nAutomatically created from code review meeting."
-
-        success, task_id = create_asana_task(asana_pat, project_id, task_name, task_notes, assignee)
-        results.append({
-            "task": task_name,
-            "assignee": assignee,
-            "success": success,
-            "task_id": task_id if success else None,
-            "error": task_id if not success else None
-        })
-
-    return results
-
-# --------------------------------------------------------------------
-# UI Functions
-# --------------------------------------------------------------------
+            st.progress(job['progress'] or 0.0, text=f"{label}: {job['stage']} {job['detail'] or ''}")
+            partial = job['partial'] or {}
+            if partial.get('fetch'):
+                st.caption(partial['fetch'])
+            if partial.get('transcript'):
+                with st.expander("Transcript so far"):
+                    st.text(partial['transcript'])
+            if partial.get('analysis'):
+                render_analysis_preview(st.empty(), partial['analysis'])
+    st.experimental_set_query_params(jobs=",".join(st.session_state['active_jobs']))
 
 def upload_tab():
     """Upload and process meeting content (includes GitHub integration)."""
@@ -521,6 +262,24 @@ def upload_tab():
     if text_input_option:
         direct_text = st.text_area("Enter meeting transcript", height=200)
 
+    if uploaded_file:
+        with st.expander("Benchmark transcription backends"):
+            benchmark_backends = st.multiselect("Backends", list(TRANSCRIPTION_BACKENDS),
+                                                default=list(TRANSCRIPTION_BACKENDS),
+                                                format_func=TRANSCRIPTION_BACKENDS.get)
+            if st.button("Run benchmark") and benchmark_backends:
+                results = []
+                for name in benchmark_backends:
+                    audio_blocks = extract_audio(uploaded_file, on_error=st.error)
+                    if audio_blocks is None:
+                        break
+                    with st.spinner(f"Transcribing with {TRANSCRIPTION_BACKENDS[name]}..."):
+                        try:
+                            results.append(benchmark_transcription_backend(get_transcription_backend(name), audio_blocks))
+                        except (TranscriptionError, AudioDecodeError) as e:
+                            st.error(f"{name}: {e}")
+                st.dataframe(results, use_container_width=True)
+
     repo_url = st.text_input("GitHub Repo URL (optional)")
     github_token = st.text_input("GitHub Token (optional)", type="password")
     branch = st.text_input("GitHub Branch (default: main)", value="main")
@@ -530,54 +289,124 @@ def upload_tab():
             st.error("Please upload a file or enter a meeting transcript.")
             return
 
-        with st.spinner("Processing..."):
-            text = ""
-            if uploaded_file:
-                audio_path = extract_audio(uploaded_file)
-                if not audio_path:
-                    return
-                text = speech_to_text(audio_path)
-            else:
-                text = direct_text
-
-            files_dict = {}
-            if repo_url:
-                files_dict, err = get_github_files(repo_url, branch, github_token)
-                if err:
-                    st.error(err)
-
-            summary_data = analyze_with_groq(text, files_dict)
-            st.session_state['extracted_text'] = text
-            st.session_state['summary_data'] = summary_data
-            st.session_state['github_files_content'] = files_dict
-            st.session_state['processing_complete'] = True
-            st.session_state['meeting_archive'].append({
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "summary_data": summary_data
-            })
-            st.success("Processing complete!")
+        backend = None
+        if uploaded_file:
+            try:
+                backend = get_transcription_backend(st.session_state.get('transcription_backend'))
+            except TranscriptionError as e:
+                st.error(str(e))
+                return
+        params = {"source": uploaded_file.name if uploaded_file else "transcript", "repo_url": repo_url, "branch": branch}
+        inputs = {
+            "uploaded_file": uploaded_file,
+            "direct_text": direct_text,
+            "repo_url": repo_url,
+            "branch": branch,
+            "github_token": github_token,
+            "backend": backend,
+            "repo_cache": get_repo_file_cache(),
+            "llm_cache": active_llm_cache(),
+            # Unchanged transcript segments keep their previous analysis unless the cache is bypassed
+            "segment_memo": {} if st.session_state.get('llm_cache_bypass') else st.session_state['analysis_segments'],
+        }
+        if (st.session_state['github_files_snapshot']
+                and st.session_state.get('github_files_source') == (repo_url, branch)):
+            # Reused only if the branch still points at the commit these files were fetched from
+            inputs["prefetched"] = (st.session_state['github_files_snapshot'], st.session_state['github_files_content'],
+                                    st.session_state['github_file_index'])
+        st.session_state['active_jobs'].append(get_job_runner().submit(params, inputs))
+        st.experimental_set_query_params(jobs=",".join(st.session_state['active_jobs']))
+
+    render_jobs()
+
+    timings = st.session_state.get('pipeline_timings')
+    if st.session_state.get('processing_complete') and timings:
+        with st.expander(f"Processing took {timings['total_seconds']:.1f}s "
+                         f"(critical path: {' → '.join(timings['critical_path'])})"):
+            st.dataframe(timings['stages'], use_container_width=True)
+
+    fetch = st.session_state.get('repo_fetch_info')
+    if st.session_state.get('processing_complete') and fetch:
+        with st.expander(f"Fetched {fetch['files']} files in {fetch['seconds']:.1f}s ({fetch['downloaded']} downloaded, "
+                         f"indexed in {fetch.get('index_seconds', 0):.2f}s)"):
+            cache_stats = fetch['cache']
+            st.caption(f"Repository cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                       f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['blobs']} blobs, "
+                       f"{cache_stats['size_mb']} MB, {cache_stats['evictions']} evictions")
+            if fetch['slowest']:
+                st.dataframe(fetch['slowest'], use_container_width=True)
+
+    if st.session_state.get('processing_complete') and st.session_state.get('analysis_token_usage'):
+        with st.expander("Analysis token usage"):
+            st.dataframe([{"stage": stage, **totals} for stage, totals in st.session_state['analysis_token_usage'].items()],
+                         use_container_width=True)
 
     # GitHub integration UI for adding comments to code
     if st.session_state.get('processing_complete') and repo_url and github_token and st.session_state['summary_data'].get('code_feedback'):
         st.subheader("Add Code Review Comments to GitHub Files")
         code_feedback_items = st.session_state['summary_data']['code_feedback']
         if code_feedback_items and st.session_state['github_files_content']:
-            updated_files = {}
-            for file_path, content in st.session_state['github_files_content'].items():
-                relevant_feedback = [item for item in code_feedback_items if item.get('file') == file_path]
-                if relevant_feedback:
-                    updated_content = add_comments_to_code(content, relevant_feedback)
-                    updated_files[file_path] = updated_content
-            if updated_files:
-                st.write("Modified files with comments:")
+            files_content = st.session_state['github_files_content']
+            file_index = st.session_state['github_file_index']
+            feedback_by_file = group_feedback_by_file(code_feedback_items, file_index)
+            updated_files, unannotated = {}, []
+            for file_path, relevant_feedback in feedback_by_file.items():
+                if comment_syntax(file_path) is None:
+                    unannotated.append(file_path)
+                    continue
+                updated_files[file_path] = add_comments_to_code(files_content[file_path], relevant_feedback,
+                                                                file_index[file_path], path=file_path)
+            if unannotated:
+                st.caption(f"Not annotated (no safe comment syntax): {', '.join(unannotated)}. "
+                           "Their findings can still be posted as a pull request review.")
+            if feedback_by_file:
+                if updated_files:
+                    st.write("Modified files with comments:")
                 for file_path, updated_content in updated_files.items():
                     st.subheader(f"File: {file_path}")
                     st.code(updated_content, language="python") # Adjust language as needed
-                    # Note: Directly committing these changes to GitHub is complex and requires
-                    # more advanced GitHub API interactions (creating commits, branches, PRs).
-                    # This UI provides a preview of the changes.
-                    st.info("The above code shows the comments that would be added. Automatically pushing these changes to GitHub requires more complex implementation using the GitHub API (e.g., creating a new branch, committing the changes, and creating a pull request), which is beyond the scope of this basic integration.")
+
+                findings = sum(len(items) for items in feedback_by_file.values())
+                publish_mode = st.radio("Publish all findings as", ["One commit on a new branch", "One pull request review"],
+                                        horizontal=True)
+                if publish_mode == "One commit on a new branch" and not updated_files:
+                    st.info("None of these files can be annotated; post the findings as a pull request review instead.")
+                elif publish_mode == "One commit on a new branch":
+                    new_branch = st.text_input("New branch name",
+                                               value=f"code-review-{(st.session_state.get('meeting_id') or 'meeting')[:8]}")
+                    open_pr = st.checkbox("Open a pull request", value=True)
+                    if st.button(f"Commit {len(updated_files)} annotated files"):
+                        with st.spinner("Creating commit..."):
+                            result, err = publish_review_commit(
+                                repo_url, branch, github_token, updated_files, new_branch,
+                                f"Add code review comments ({findings} findings)",
+                                st.session_state['github_files_snapshot'],
+                                pr_title="Code review meeting findings" if open_pr else None,
+                                pr_body=st.session_state['summary_data'].get('summary', ''))
+                        if err:
+                            st.error(err)
+                        else:
+                            st.success(f"Committed {result['commit_sha'][:7]} to {result['branch']} "
+                                       f"in {result['api_calls']} API calls")
+                            if result['skipped']:
+                                st.caption(f"Not committed (not a regular UTF-8 file): {', '.join(result['skipped'])}")
+                            if result['pr_url']:
+                                st.markdown(f"[Open pull request]({result['pr_url']})")
+                else:
+                    pr_number = st.number_input("Pull request number", min_value=1, step=1)
+                    if st.button(f"Post review with {findings} findings"):
+                        with st.spinner("Posting review..."):
+                            result, err = publish_pull_request_review(
+                                repo_url, int(pr_number), github_token, feedback_by_file, file_index,
+                                st.session_state['github_files_snapshot'], branch,
+                                st.session_state['summary_data'].get('summary', ''))
+                        if err:
+                            st.error(err)
+                        else:
+                            st.success(f"Posted review with {result['inline']} inline comments "
+                                       f"({result['in_body']} in the review body) in {result['api_calls']} API calls")
+                            if result['review_url']:
+                                st.markdown(f"[View review]({result['review_url']})")
             else:
                 st.info("No code feedback found for the fetched GitHub files.")
         else:
@@ -641,6 +470,95 @@ def summary_tab():
         href = f'<a href="data:application/json;base64,{b64}" download="meeting_summary.json">Download JSON</a>'
         st.markdown(href, unsafe_allow_html=True)
 
+def archive_tab():
+    """Search past meetings page by page; a meeting's transcript is only loaded when opened."""
+    st.header("Meeting Archive")
+    archive = get_meeting_archive()
+    col1, col2, col3, col4 = st.columns(4)
+    text = col1.text_input("Search summaries, decisions, tasks and feedback")
+    repo_url = col2.selectbox("Repository", [""] + archive.repositories(), format_func=lambda r: r or "All")
+    assignee = col3.selectbox("Assignee", [""] + archive.assignees(), format_func=lambda a: a or "Anyone")
+    dates = col4.date_input("Date range", value=())
+    since = until = None
+    if len(dates) >= 1:
+        since = time.mktime(dates[0].timetuple())
+    if len(dates) == 2:
+        until = time.mktime(dates[1].timetuple()) + 86400
+
+    filters = (text, repo_url, assignee, since, until)
+    if st.session_state.get('archive_filters') != filters:
+        st.session_state['archive_filters'] = filters
+        st.session_state['archive_page'] = 0
+    page = st.session_state.get('archive_page', 0)
+
+    started = time.perf_counter()
+    rows, total = archive.search(text, repo_url, assignee, since, until, ARCHIVE_PAGE_SIZE, page * ARCHIVE_PAGE_SIZE)
+    pages = max(1, -(-total // ARCHIVE_PAGE_SIZE))
+    st.caption(f"{total} meetings, page {page + 1} of {pages} ({1000 * (time.perf_counter() - started):.1f} ms)")
+    for row in rows:
+        with st.container(border=True):
+            st.markdown(f"**{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created']))}** — {row['source']}"
+                        + (f" ({row['repo_url']})" if row['repo_url'] else ""))
+            st.caption(f"{row['action_items']} action items, {row['code_feedback']} code feedback, "
+                       f"{row['decisions']} decisions")
+            st.write(row['preview'])
+            if st.button("Open", key=f"archive_open_{row['id']}"):
+                meeting = archive.load(row['id'])
+                st.session_state['extracted_text'] = meeting['text']
+                st.session_state['summary_data'] = meeting['summary_data']
+                st.session_state['github_files_content'], st.session_state['github_file_index'] = {}, {}
+                st.session_state['github_files_source'] = None
+                st.session_state['github_files_snapshot'] = None
+                st.session_state['analysis_segments'] = {}
+                st.session_state['chat_history'] = []
+                st.session_state['meeting_id'] = meeting['id']
+                st.session_state['processing_complete'] = True
+                st.success("Meeting loaded; see the Summary, Chat and Email tabs.")
+    col1, col2 = st.columns(2)
+    if col1.button("Previous page", disabled=page == 0):
+        st.session_state['archive_page'] = page - 1
+        st.rerun()
+    if col2.button("Next page", disabled=page + 1 >= pages):
+        st.session_state['archive_page'] = page + 1
+        st.rerun()
+
+def diagnostics_tab():
+    """Spans of the current meeting's run, process-wide metrics and exports for dashboards."""
+    st.header("Diagnostics")
+    telemetry = get_telemetry()
+    trace_id = st.session_state.get('trace_id')
+    spans = [s for s in telemetry.recent_spans() if s['trace_id'] == trace_id] if trace_id else []
+    st.subheader("Current meeting")
+    if spans:
+        origin = min(s['start'] for s in spans)
+        rows = [{"span": s['name'], "start_ms": round(1000 * (s['start'] - origin)), "ms": round(1000 * s['seconds'], 1),
+                 "status": s['status'], **{k: v for k, v in s['attributes'].items() if v is not None}}
+                for s in sorted(spans, key=lambda s: s['start'])]
+        st.caption(f"{len(rows)} spans in trace {trace_id}")
+        st.dataframe(rows, use_container_width=True)
+    else:
+        st.caption("Process a meeting to see its spans (older spans are dropped as new ones arrive).")
+
+    counters, histograms = telemetry.metrics()
+    st.subheader("Counters")
+    if counters:
+        st.dataframe([{"metric": name, "labels": ", ".join(f"{k}={v}" for k, v in labels), "value": value}
+                      for (name, labels), value in sorted(counters.items())], use_container_width=True)
+    st.subheader("Latency")
+    if histograms:
+        st.dataframe([{"metric": name, "labels": ", ".join(f"{k}={v}" for k, v in labels), "count": h["count"],
+                       "avg_ms": round(1000 * h["sum"] / h["count"], 1)}
+                      for (name, labels), h in sorted(histograms.items())], use_container_width=True)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.download_button("Prometheus metrics", telemetry.prometheus_text(), "metrics.prom", "text/plain")
+    col2.download_button("OTLP traces (JSON)", json.dumps(telemetry.otlp_traces()), "traces.json", "application/json")
+    col3.download_button("OTLP metrics (JSON)", json.dumps(telemetry.otlp_metrics()), "metrics.json",
+                         "application/json")
+    if col4.button("Reset telemetry"):
+        telemetry.reset()
+        st.rerun()
+
 def chat_tab():
     """Interactive chatbot for meeting content."""
     st.header("Chat with Meeting")
@@ -660,9 +578,20 @@ def chat_tab():
     if query := st.chat_input("Ask about the meeting..."):
         st.session_state['chat_history'].append({"role": "user", "content": query})
         chat_container.chat_message("user").write(query)
-        response = chatbot_response(query, st.session_state['summary_data'])
+        if st.session_state.get('chat_index_meeting') != st.session_state.get('meeting_id'):
+            with st.spinner("Indexing meeting transcript and repository..."):
+                st.session_state['chat_index'] = build_chat_index(st.session_state['extracted_text'],
+                                                                  st.session_state['github_files_content'])
+                st.session_state['chat_index_meeting'] = st.session_state.get('meeting_id')
+        with chat_container.chat_message("ai"):
+            placeholder = st.empty()
+            response = ""
+            for delta in chatbot_response_stream(query, st.session_state['summary_data'], active_llm_cache(),
+                                                 st.session_state['chat_index'], st.error):
+                response += delta
+                placeholder.markdown(response + "▌")
+            placeholder.markdown(response)
         st.session_state['chat_history'].append({"role": "ai", "content": response})
-        chat_container.chat_message("ai").write(response)
 
 def email_tab():
     """Send meeting summary via email using SMTP credentials."""
@@ -679,28 +608,31 @@ def email_tab():
     sender_password = st.text_input("Sender Password", type="password")
     recipients = st.text_input("Recipient Emails (comma-separated)", "")
 
+    recipient_list = [r.strip() for r in recipients.split(",") if r.strip()]
+    st.caption("Each recipient gets their own email; assignees (matched on \"Name <address>\" or the address) "
+               "only see their own action items.")
+
     # Preview email content
     if st.checkbox("Preview email content"):
         st.subheader("Email Preview")
-        summary = st.session_state['summary_data'].get('summary', 'No summary available')
-        action_items = st.session_state['summary_data'].get('action_items', [])
-        st.write("**Subject:** Code Review Meeting Summary")
-        st.write("**Body:**")
-        st.write("### Meeting Summary")
-        st.write(summary)
-        st.write("### Action Items")
-        for item in action_items:
-            st.write(f"- {item.get('task', '')} (Assignee: {item.get('assignee', '')})")
+        preview_for = st.selectbox("Preview for", recipient_list or ["(all recipients)"])
+        body, _ = render_summary_email(render_email_parts(st.session_state['summary_data']), preview_for)
+        st.write(f"**Subject:** {EMAIL_SUBJECT}")
+        st.markdown(body, unsafe_allow_html=True)
 
     if st.button("Send Email"):
-        if not (smtp_server and smtp_port and sender_email and sender_password and recipients):
+        if not (smtp_server and smtp_port and sender_email and sender_password and recipient_list):
             st.error("Please fill in all SMTP and recipient fields.")
             return
-        recipient_list = [r.strip() for r in recipients.split(",")]
-        if send_email(smtp_server, smtp_port, sender_email, sender_password, recipient_list, st.session_state['summary_data']):
-            st.success("Email sent successfully!")
+        with st.spinner(f"Sending to {len(recipient_list)} recipients..."):
+            results = send_summary_emails(smtp_server, smtp_port, sender_email, sender_password, recipient_list,
+                                          st.session_state['summary_data'])
+        sent = sum(result["success"] for result in results)
+        if sent == len(results):
+            st.success(f"Email sent to all {sent} recipients!")
         else:
-            st.error("Failed to send email.")
+            st.error(f"Email sent to {sent} of {len(results)} recipients.")
+        st.dataframe(results, use_container_width=True)
 
 def asana_tab():
     """Improved Asana integration with better validation and project ID handling."""
@@ -761,7 +693,12 @@ def asana_tab():
                 return
 
             with st.spinner("Creating tasks in Asana..."):
-                results = process_all_asana_tasks(asana_pat, project_id, current_action_items)
+                stats = {}
+                results = process_all_asana_tasks(asana_pat, project_id, current_action_items, stats,
+                                                  created=st.session_state['asana_tasks_created'])
+                st.caption(f"{stats['api_calls']} Asana API calls, {stats['created']} tasks created in "
+                           f"{stats['seconds']:.1f}s ({stats['tasks_per_second']} tasks/s), "
+                           f"{stats['skipped']} already created")
 
                 # Track results for user feedback
                 success_count = sum(1 for r in results if r['success'])
@@ -772,22 +709,61 @@ def asana_tab():
                     # Show details of created tasks
                     st.subheader("Created Tasks")
                     for result in results:
-                        if result['success']:
-                            st.write(f"✅ '{result['task']}' - Assignee: {result['assignee']}")
+                        if result['success'] and result['skipped']:
+                            st.write(f"↩️ '{result['task']}' - already created, not sent again")
+                        elif result['success']:
+                            st.write(f"✅ '{result['task']}' - Assignee: {result['assignee']} "
+                                     f"({result['latency_ms']:.0f} ms)")
                         else:
                             st.write(f"❌ Failed to create '{result['task']}': {result['error']}")
 
-                    # Store created tasks in session state
-                    st.session_state['asana_tasks_created'] = results
-
                 else:
                     st.error("Failed to create any tasks in Asana. Please check your credentials and try again.")
 
+                # Store created tasks in session state; their keys make re-clicking idempotent
+                known = {r['key'] for r in st.session_state['asana_tasks_created'] if r.get('key')}
+                st.session_state['asana_tasks_created'] += [r for r in results
+                                                            if r['success'] and not r['skipped'] and r['key'] not in known]
+
 # --------------------------------------------------------------------
 # Main UI
 # --------------------------------------------------------------------
 def main():
-    tabs = st.tabs(["Upload & Process", "Summary & Insights", "Chat", "Email", "Asana Integration"])
+    st.sidebar.selectbox("Transcription backend", list(TRANSCRIPTION_BACKENDS),
+                         index=list(TRANSCRIPTION_BACKENDS).index(TRANSCRIPTION_BACKEND),
+                         format_func=TRANSCRIPTION_BACKENDS.get, key="transcription_backend")
+    with st.sidebar.expander("LLM response cache"):
+        st.checkbox("Bypass cache", key="llm_cache_bypass")
+        cache_stats = get_llm_cache().stats()
+        st.metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+        st.caption(f"{cache_stats['memory_hits']} memory hits, {cache_stats['disk_hits']} disk hits, "
+                   f"{cache_stats['misses']} misses; {cache_stats['entries']} entries ({cache_stats['size_mb']} MB)")
+        if st.button("Clear LLM cache"):
+            get_llm_cache().clear()
+    with st.sidebar.expander("LLM latency"):
+        calls = list(get_llm_latency_log())[-20:]
+        if calls:
+            st.dataframe(calls[::-1], use_container_width=True)
+        else:
+            st.caption("No LLM calls yet.")
+    with st.sidebar.expander("Connection pools"):
+        for service in ("github", "asana"):
+            stats = get_http_session(service).stats
+            average_ms = 1000 * stats["seconds"] / stats["requests"] if stats["requests"] else 0.0
+            st.caption(f"{service}: {stats['requests']} requests, {average_ms:.0f} ms avg, {stats['retries']} retries")
+        if st.button("Measure latency saved"):
+            st.json(measure_connection_reuse(f"{GITHUB_API_URL}/rate_limit"))
+    with st.sidebar.expander("Startup profile"):
+        profile = startup_profile()
+        st.caption(f"pipeline import: {1000 * profile['pipeline_import_seconds']:.0f} ms; "
+                   f"last script run: {1000 * st.session_state.get('last_run_seconds', 0):.0f} ms; "
+                   f"peak RSS: {profile['peak_rss_mb']} MB")
+        if profile['lazy_imports']:
+            st.dataframe([{"module": m, "ms": round(1000 * s)} for m, s in profile['lazy_imports'].items()],
+                         use_container_width=True)
+        else:
+            st.caption("No media, speech or LLM modules loaded yet.")
+    tabs = st.tabs(["Upload & Process", "Summary & Insights", "Chat", "Email", "Asana Integration", "Archive", "Diagnostics"])
     with tabs[0]:
         upload_tab()
     with tabs[1]:
@@ -798,6 +774,17 @@ def main():
         email_tab()
     with tabs[4]:
         asana_tab()
+    with tabs[5]:
+        archive_tab()
+    with tabs[6]:
+        diagnostics_tab()
+
+    st.session_state['last_run_seconds'] = time.perf_counter() - SCRIPT_STARTED
+
+    # Poll running jobs; each rerun refreshes their progress
+    if st.session_state['active_jobs']:
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
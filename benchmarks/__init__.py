@@ -0,0 +1 @@
+"""Pipeline benchmark suite; run with python -m benchmarks.run."""
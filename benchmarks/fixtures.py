@@ -0,0 +1,99 @@
+"""
+Deterministic synthetic inputs for the benchmark suite: speech-like WAV recordings,
+generated repositories, meeting transcripts, code feedback and action items.
+"""
+import os
+import random
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+def make_audio_fixture(path, seconds, sample_rate=SAMPLE_RATE, seed=0):
+    """
+    Write a mono 16-bit WAV of `seconds` length: bursts of 2-8 s of modulated tones
+    separated by 0.4-1.2 s pauses, so silence splitting behaves as on real speech.
+    Existing fixtures of the right length are reused.
+    """
+    frames = int(seconds * sample_rate)
+    if os.path.exists(path):
+        with wave.open(path, 'rb') as existing:
+            if existing.getnframes() == frames:
+                return path
+    rng = random.Random(seed)
+    with wave.open(path, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        written = 0
+        while written < frames:
+            burst = min(frames - written, int(rng.uniform(2, 8) * sample_rate))
+            t = np.arange(burst) / sample_rate
+            tone = 8000 * np.sin(2 * np.pi * rng.uniform(120, 260) * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+            out.writeframes(tone.astype('<i2').tobytes())
+            written += burst
+            pause = min(frames - written, int(rng.uniform(0.4, 1.2) * sample_rate))
+            out.writeframes(b'\0\0' * pause)
+            written += pause
+    return path
+
+def make_repository(n_files, lines_per_file=60, seed=0):
+    """Generate {path: content} for a Python-like repository of n_files files in nested packages."""
+    rng = random.Random(seed)
+    files = {}
+    for i in range(n_files):
+        package = f"src/pkg_{i // 100}" if n_files > 100 else "src"
+        body = [f'"""Module {i}."""', "import os", ""]
+        while len(body) < lines_per_file:
+            verb = rng.choice(['load', 'parse', 'fetch', 'render', 'update'])
+            name = f"{verb}_{rng.choice(['user', 'cache', 'token', 'file', 'job'])}_{len(body)}"
+            body += [f"def {name}(value):",
+                     f"    # handles {name.replace('_', ' ')}",
+                     "    if not value:",
+                     "        return None",
+                     f"    return os.path.join(str(value), '{name}')",
+                     ""]
+        files[f"{package}/module_{i}.py"] = "\n".join(body[:lines_per_file]) + "\n"
+    return files
+
+def make_transcript(tokens, files=None, seed=0):
+    """A timestamped meeting transcript of roughly `tokens` tokens that mentions files and functions from `files`."""
+    rng = random.Random(seed)
+    paths = sorted(files or {})
+    speakers = ["Alice Smith", "Bob Jones", "Carol White", "Dan Brown"]
+    lines, length, second = [], 0, 0
+    while length < tokens * 4:
+        sentence = rng.choice([
+            "I think we should refactor this before the release.",
+            "The retry logic needs a backoff, otherwise we hammer the API.",
+            "Can you add a test for the empty input case?",
+            "Let's agree to ship this behind a feature flag.",
+            "The cache invalidation here looks wrong to me.",
+        ])
+        if paths and rng.random() < 0.3:
+            sentence += f" Look at {rng.choice(paths).rsplit('/', 1)[-1]} around the parse function."
+        line = f"[{second // 3600:02d}:{second % 3600 // 60:02d}:{second % 60:02d}] {rng.choice(speakers)}: {sentence}"
+        lines.append(line)
+        length += len(line) + 1
+        second += rng.randint(3, 12)
+    return "\n".join(lines)
+
+def make_feedback(files, n_items, seed=0):
+    """n_items code_feedback entries spread over the given files, anchored by line number."""
+    rng = random.Random(seed)
+    paths = sorted(files)
+    items = []
+    for i in range(n_items):
+        path = rng.choice(paths)
+        line_count = files[path].count("\n")
+        items.append({"file": path, "line_number": str(rng.randint(1, max(1, line_count))),
+                      "feedback": f"Finding {i}: handle the error path", "recommendation": "Add a guard clause",
+                      "code_suggestion": "if value is None:\n    return None"})
+    return items
+
+def make_action_items(n_items, seed=0):
+    """n_items action items assigned to a mix of known users, unknown names and nobody."""
+    rng = random.Random(seed)
+    assignees = [f"User {i}" for i in range(0, 250, 7)] + ["Someone Else", "Unassigned", ""]
+    return [{"task": f"Follow up on item {i}", "assignee": rng.choice(assignees)} for i in range(n_items)]
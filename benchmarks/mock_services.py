@@ -0,0 +1,321 @@
+"""
+Local stand-ins for the GitHub, Groq and Asana APIs and an SMTP server used by the benchmark suite.
+
+Each service runs a threaded HTTP server on 127.0.0.1, sleeps `latency` seconds before
+every response and counts requests by route, so a benchmark can report how many API
+calls a stage made; GET /__calls returns the counts and is not itself counted. Point
+the pipeline at them through GITHUB_API_URL, GITHUB_RAW_URL, GROQ_BASE_URL and
+ASANA_API_URL before importing it. MockSMTP needs the optional aiosmtpd package.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+class MockService:
+    """Base class: subclasses implement handle(method, path, query, headers, body) -> (status, headers, body)."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _dispatch(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b""
+                url = urlsplit(self.path)
+                if url.path == "/__calls":
+                    with service._lock:
+                        status, headers, payload = 200, {}, {"total": sum(service.calls.values()),
+                                                             "by_route": dict(service.calls)}
+                    return self._respond(status, headers, payload)
+                if service.latency:
+                    time.sleep(service.latency)
+                self._respond(*service.handle(method, unquote(url.path), url.query, self.headers, body))
+
+            def _respond(self, status, headers, payload):
+                if not isinstance(payload, bytes):
+                    payload = json.dumps(payload).encode()
+                    headers = {"Content-Type": "application/json", **headers}
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def count(self, route):
+        with self._lock:
+            self.calls[route] += 1
+
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, method, path, query, headers, body):
+        raise NotImplementedError
+
+class MockGitHub(MockService):
+    """
+    Serves repositories registered with add_repository() through the endpoints
+    get_github_files uses: commits/{branch} (with ETag / If-None-Match), a recursive
+    git/trees listing and raw file downloads. The API and raw URLs are the same server.
+    Also accepts the writes publish_review_commit and publish_pull_request_review make
+    (git/ref, git/commits, git/trees, git/refs, pulls, pulls/{n}/reviews) and records
+    them in `created`. With reject_inline_comments, reviews with inline comments get a
+    422, as GitHub answers comments on lines outside the diff.
+    """
+
+    def __init__(self, latency=0.0, reject_inline_comments=False):
+        super().__init__(latency)
+        self.repos = {}
+        self.reject_inline_comments = reject_inline_comments
+        self.created = {"trees": [], "commits": [], "refs": [], "pulls": [], "reviews": []}
+
+    def add_repository(self, owner, repo, files):
+        blobs = {path: hashlib.sha1(b"blob %d\0" % len(data.encode()) + data.encode()).hexdigest()
+                 for path, data in files.items()}
+        commit_sha = hashlib.sha1(json.dumps(sorted(blobs.items())).encode()).hexdigest()
+        self.repos[(owner, repo)] = {"files": files, "blobs": blobs, "commit_sha": commit_sha,
+                                     "tree_sha": hashlib.sha1(commit_sha.encode()).hexdigest()}
+
+    def handle(self, method, path, query, headers, body):
+        if method == "POST" or re.match(r'^/repos/[^/]+/[^/]+(?:/git/(?:ref|commits)/.+|/pulls/\d+)?$', path):
+            return self.handle_write_api(method, path, json.loads(body or b"{}"))
+        match = re.match(r'^/repos/([^/]+)/([^/]+)/commits/[^/]+$', path)
+        if match and (repo := self.repos.get(match.groups())):
+            self.count("commits")
+            etag = f'"{repo["commit_sha"]}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, {"ETag": etag}, b""
+            return 200, {"ETag": etag}, {"sha": repo["commit_sha"], "commit": {"tree": {"sha": repo["tree_sha"]}}}
+        match = re.match(r'^/repos/([^/]+)/([^/]+)/git/trees/[^/]+$', path)
+        if match and (repo := self.repos.get(match.groups())):
+            self.count("trees")
+            tree = [{"path": p, "mode": "100644", "type": "blob", "sha": sha} for p, sha in repo["blobs"].items()]
+            return 200, {}, {"sha": repo["tree_sha"], "tree": tree, "truncated": False}
+        match = re.match(r'^/([^/]+)/([^/]+)/[0-9a-f]{40}/(.+)$', path)
+        if match and (repo := self.repos.get(match.groups()[:2])) and match.group(3) in repo["files"]:
+            self.count("raw")
+            return 200, {"Content-Type": "text/plain"}, repo["files"][match.group(3)].encode()
+        self.count("not_found")
+        return 404, {}, {"message": "Not Found"}
+
+    def _new_sha(self, kind, payload):
+        with self._lock:
+            self.created[kind].append(payload)
+            serial = len(self.created[kind])
+        return hashlib.sha1(f"{kind}:{serial}:{json.dumps(payload, sort_keys=True)}".encode()).hexdigest()
+
+    def handle_write_api(self, method, path, payload):
+        match = re.match(r'^/repos/([^/]+)/([^/]+)(/.*)?$', path)
+        repo = self.repos.get(match.groups()[:2]) if match else None
+        if repo is None:
+            self.count("not_found")
+            return 404, {}, {"message": "Not Found"}
+        owner, name, rest = match.group(1), match.group(2), match.group(3) or ""
+        if method == "GET" and not rest:
+            self.count("repo")
+            return 200, {}, {"default_branch": "main"}
+        if method == "GET" and rest.startswith("/git/ref/heads/"):
+            self.count("git_ref")
+            return 200, {}, {"ref": f"refs/heads/{rest[len('/git/ref/heads/'):]}",
+                             "object": {"sha": repo["commit_sha"], "type": "commit"}}
+        if method == "GET" and rest.startswith("/git/commits/"):
+            self.count("git_commit")
+            sha = rest.rsplit('/', 1)[-1]
+            if sha != repo["commit_sha"]:
+                return 404, {}, {"message": "Not Found"}
+            return 200, {}, {"sha": sha, "tree": {"sha": repo["tree_sha"]}}
+        if method == "POST" and rest == "/git/trees":
+            self.count("create_tree")
+            return 201, {}, {"sha": self._new_sha("trees", payload)}
+        if method == "POST" and rest == "/git/commits":
+            self.count("create_commit")
+            return 201, {}, {"sha": self._new_sha("commits", payload)}
+        if method == "POST" and rest == "/git/refs":
+            self.count("create_ref")
+            with self._lock:
+                exists = any(ref["ref"] == payload.get("ref") for ref in self.created["refs"])
+            if exists:
+                return 422, {}, {"message": "Reference already exists"}
+            self._new_sha("refs", payload)
+            return 201, {}, {"ref": payload.get("ref"), "object": {"sha": payload.get("sha")}}
+        if method == "POST" and rest == "/pulls":
+            self.count("create_pull")
+            self._new_sha("pulls", payload)
+            number = len(self.created["pulls"])
+            return 201, {}, {"number": number, "html_url": f"https://github.com/{owner}/{name}/pull/{number}"}
+        if method == "GET" and (pull := re.match(r'^/pulls/(\d+)$', rest)):
+            self.count("pull")
+            return 200, {}, {"number": int(pull.group(1)), "head": {"ref": "main", "sha": repo["commit_sha"]}}
+        if method == "POST" and (pull := re.match(r'^/pulls/(\d+)/reviews$', rest)):
+            self.count("create_review")
+            if self.reject_inline_comments and payload.get("comments"):
+                return 422, {}, {"message": "Unprocessable Entity: line must be part of the diff"}
+            self._new_sha("reviews", payload)
+            review_id = len(self.created["reviews"])
+            return 200, {}, {"id": review_id, "html_url": f"https://github.com/{owner}/{name}/pull/"
+                                                          f"{pull.group(1)}#pullrequestreview-{review_id}"}
+        self.count("not_found")
+        return 404, {}, {"message": "Not Found"}
+
+class MockGroq(MockService):
+    """
+    OpenAI-compatible chat completions endpoint returning a fixed analysis JSON
+    (or a plain summary for reduce prompts), with usage estimated from text length.
+    """
+
+    def __init__(self, latency=0.0, analysis=None):
+        super().__init__(latency)
+        self.analysis = analysis or {
+            "summary": "The team reviewed the change and agreed on follow-ups.",
+            "action_items": [{"task": "Add retries to the fetch loop", "assignee": "Alice Smith"},
+                             {"task": "Write tests for the parser", "assignee": "Bob Jones"}],
+            "code_feedback": [{"file": "src/module_0.py", "line_number": "3", "feedback": "Handle the empty case",
+                               "recommendation": "Return early", "code_suggestion": ""}],
+            "decisions": ["Ship behind a feature flag"],
+        }
+
+    def handle(self, method, path, query, headers, body):
+        if method != "POST" or not path.endswith("/chat/completions"):
+            self.count("not_found")
+            return 404, {}, {"error": {"message": "Not Found"}}
+        self.count("chat_completions")
+        request = json.loads(body or b"{}")
+        prompt = "".join(m.get("content", "") for m in request.get("messages", []))
+        if "JSON" in prompt:
+            content = json.dumps(self.analysis)
+        else:
+            content = self.analysis["summary"]
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+        return 200, {}, {
+            "id": f"chatcmpl-{self.total_calls()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+class MockAsana(MockService):
+    """
+    Project lookup, paginated workspace users and task creation. With rate_limit_every=N,
+    every Nth task creation is answered with 429 and a short Retry-After.
+    """
+
+    def __init__(self, latency=0.0, users=None, page_size=100, rate_limit_every=0):
+        super().__init__(latency)
+        self.users = users or [f"User {i}" for i in range(250)]
+        self.page_size = page_size
+        self.rate_limit_every = rate_limit_every
+        self._task_posts = 0
+
+    def handle(self, method, path, query, headers, body):
+        if method == "GET" and (match := re.match(r'^/projects/([^/]+)$', path)):
+            self.count("projects")
+            return 200, {}, {"data": {"gid": match.group(1), "workspace": {"gid": "workspace-1"}}}
+        if method == "GET" and re.match(r'^/workspaces/[^/]+/users$', path):
+            self.count("users")
+            offset = int((re.search(r'offset=(\d+)', query) or [0, 0])[1])
+            page = self.users[offset:offset + self.page_size]
+            next_offset = offset + self.page_size
+            return 200, {}, {
+                "data": [{"gid": f"user-{offset + i}", "name": name} for i, name in enumerate(page)],
+                "next_page": {"offset": str(next_offset)} if next_offset < len(self.users) else None,
+            }
+        if method == "POST" and path == "/tasks":
+            self.count("tasks")
+            with self._lock:
+                self._task_posts += 1
+                limited = self.rate_limit_every and self._task_posts % self.rate_limit_every == 0
+            if limited:
+                return 429, {"Retry-After": "0.1"}, {"errors": [{"message": "Rate limited"}]}
+            return 201, {}, {"data": {"gid": f"task-{self._task_posts}"}}
+        self.count("not_found")
+        return 404, {}, {"errors": [{"message": "Not Found"}]}
+
+class MockSMTP:
+    """
+    aiosmtpd server on 127.0.0.1 that accepts any login without TLS and keeps every
+    message it receives. Counts SMTP sessions (EHLO) and messages like MockService
+    counts routes, and waits `latency` seconds before accepting each message.
+    """
+
+    def __init__(self, latency=0.0):
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.smtp import AuthResult
+
+        self.latency = latency
+        self.calls = Counter()
+        self.messages = []
+        self._lock = threading.Lock()
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        self.controller = Controller(self, hostname="127.0.0.1", port=self.port,
+                                     authenticator=lambda *args: AuthResult(success=True), auth_require_tls=False)
+
+    def count(self, route):
+        with self._lock:
+            self.calls[route] += 1
+
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.count("sessions")
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.count("messages")
+        with self._lock:
+            self.messages.append((list(envelope.rcpt_tos), envelope.content))
+        return "250 Message accepted for delivery"
+
+    def start(self):
+        self.controller.start()
+        return self
+
+    def stop(self):
+        self.controller.stop()
@@ -0,0 +1,352 @@
+"""
+End-to-end pipeline benchmarks against synthetic fixtures and local stand-in services.
+
+    python -m benchmarks.run                      # run everything, compare with benchmarks/baseline.json
+    python -m benchmarks.run --stages get_github_files,analyze_with_groq --iterations 3
+    python -m benchmarks.run --save-baseline      # record the current numbers as the baseline
+
+Timings depend on the machine, so no baseline is shipped: record one with
+--save-baseline on the machine (or CI runner) that will run the comparison. Without
+it there is nothing to compare against; --fail-on-regression then exits with an error
+instead of passing.
+
+Every case runs in a fresh process, so its peak RSS is its own. The GitHub, Groq and
+Asana APIs and the SMTP server are replaced by the stand-ins in benchmarks.mock_services
+(with configurable latency), and speech recognition by a stub backend with a fixed
+per-segment latency.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import requests
+
+from benchmarks.fixtures import (make_action_items, make_audio_fixture, make_feedback, make_repository,
+                                 make_transcript)
+from benchmarks.mock_services import MockAsana, MockGitHub, MockGroq, MockSMTP
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+STAGES = ["extract_audio", "speech_to_text", "get_github_files", "get_github_files_warm", "analyze_with_groq",
+          "add_comments_to_code", "publish_review_commit", "publish_pull_request_review", "process_all_asana_tasks",
+          "send_summary_emails"]
+ASANA_PROJECT_ID = "1200000000000001"
+PUBLISH_REPO = ("bench", "publish")
+# Documented worst cases of the two GitHub publish modes
+PUBLISH_API_CALL_BOUNDS = {"publish_review_commit": 6, "publish_pull_request_review": 3}
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def fetch_call_counts(service_urls):
+    """Total requests served so far by each stand-in service."""
+    return {name: requests.get(f"{url}/__calls").json()["total"] for name, url in service_urls.items()}
+
+def run_case(stage, param, iterations, warmup, fixture_dir, stt_latency, service_urls, smtp_latency=0.0):
+    """
+    Run one stage `iterations` times after `warmup` untimed runs. Executed in a
+    fresh worker process; returns per-iteration latencies, work units per iteration,
+    API calls made during the timed runs and the process's peak RSS.
+    """
+    import pipeline
+
+    def fail(message):
+        raise RuntimeError(message)
+
+    # Stand-ins started in this process, counted alongside the shared HTTP ones
+    local_services = {}
+
+    def call_counts():
+        counts = fetch_call_counts(service_urls)
+        counts.update({name: service.total_calls() for name, service in local_services.items()})
+        return counts
+
+    if stage == "extract_audio":
+        path = make_audio_fixture(os.path.join(fixture_dir, f"audio_{param}s.wav"), param)
+        unit = "audio_s"
+
+        def once():
+            with open(path, 'rb') as media:
+                for _ in pipeline.extract_audio(media, on_error=fail):
+                    pass
+
+    elif stage == "speech_to_text":
+        path = make_audio_fixture(os.path.join(fixture_dir, f"audio_{param}s.wav"), param)
+        with open(path, 'rb') as media:
+            blocks = list(pipeline.extract_audio(media, on_error=fail))
+        unit = "audio_s"
+
+        class StubBackend(pipeline.TranscriptionBackend):
+            name = "stub"
+            max_workers = pipeline.STT_WORKERS
+
+            def transcribe(self, pcm, sample_rate):
+                time.sleep(stt_latency)
+                return "stub transcript segment"
+
+        def once():
+            pipeline.speech_to_text(iter(blocks), backend=StubBackend(), on_error=fail)
+
+    elif stage in ("get_github_files", "get_github_files_warm"):
+        unit = "files"
+        cache = None
+        if stage == "get_github_files_warm":
+            cache = pipeline.RepoFileCache(tempfile.mkdtemp(dir=fixture_dir), 1 << 34)
+            warmup = max(1, warmup)
+
+        def once():
+            files, err = pipeline.get_github_files(f"https://github.com/bench/repo-{param}", "main", "", cache=cache)
+            if err:
+                fail(err)
+            if len(files) != param:
+                fail(f"fetched {len(files)} of {param} files")
+
+    elif stage == "analyze_with_groq":
+        files = make_repository(1000)
+        text = make_transcript(param, files)
+        unit = "tokens"
+
+        def once():
+            pipeline.analyze_with_groq(text, files, on_error=fail)
+
+    elif stage == "add_comments_to_code":
+        files = make_repository(200, lines_per_file=500)
+        feedback = make_feedback(files, param)
+        unit = "findings"
+
+        def once():
+            file_index = pipeline.build_file_indexes(files)
+            for path, items in pipeline.group_feedback_by_file(feedback, file_index).items():
+                pipeline.add_comments_to_code(files[path], items, file_index[path], path=path)
+
+    elif stage in PUBLISH_API_CALL_BOUNDS:
+        files = make_repository(200, lines_per_file=500)
+        file_index = pipeline.build_file_indexes(files)
+        feedback_by_file = pipeline.group_feedback_by_file(make_feedback(files, param), file_index)
+        updated_files = {path: pipeline.add_comments_to_code(files[path], items, file_index[path], path=path)
+                         for path, items in feedback_by_file.items()}
+        repo_url = "https://github.com/{}/{}".format(*PUBLISH_REPO)
+        snapshot = {}
+        _, err = pipeline.get_github_files(repo_url, "main", "", snapshot=snapshot)
+        if err:
+            fail(err)
+        bound = PUBLISH_API_CALL_BOUNDS[stage]
+        runs = itertools.count()
+        unit = "findings"
+
+        def once():
+            if stage == "publish_review_commit":
+                # The mock refuses existing refs, so every run needs a fresh branch
+                result, err = pipeline.publish_review_commit(
+                    repo_url, "main", "bench-token", updated_files, f"review-{param}-{os.getpid()}-{next(runs)}",
+                    "Add code review comments", snapshot, pr_title="Code review meeting findings")
+            else:
+                result, err = pipeline.publish_pull_request_review(repo_url, 1, "bench-token", feedback_by_file,
+                                                                   file_index, snapshot, "main", "Meeting summary")
+            if err:
+                fail(err)
+            if result["api_calls"] > bound:
+                fail(f"{stage} made {result['api_calls']} API calls (bound {bound})")
+
+    elif stage == "process_all_asana_tasks":
+        action_items = make_action_items(param)
+        unit = "tasks"
+
+        def once():
+            results = pipeline.process_all_asana_tasks("bench-token", ASANA_PROJECT_ID, action_items)
+            failed = [r for r in results if not r["success"]]
+            if failed:
+                fail(failed[0]["error"])
+
+    elif stage == "send_summary_emails":
+        smtp = local_services["smtp"] = MockSMTP(smtp_latency).start()
+        summary_data = {"summary": "The team reviewed the change.", "action_items": make_action_items(50),
+                        "decisions": ["Ship behind a feature flag"]}
+        recipients = [f"User {i} <user{i}@example.com>" for i in range(param)]
+        unit = "recipients"
+
+        def once():
+            results = pipeline.send_summary_emails("127.0.0.1", smtp.port, "bench@example.com", "bench",
+                                                   recipients, summary_data, starttls=False)
+            failed = [r for r in results if not r["success"]]
+            if failed:
+                fail(failed[0]["error"])
+
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    try:
+        for _ in range(warmup):
+            once()
+        calls_before = call_counts()
+        latencies = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            once()
+            latencies.append(time.perf_counter() - started)
+        calls_after = call_counts()
+    finally:
+        for service in local_services.values():
+            service.stop()
+    return {
+        "latencies": latencies,
+        "units": param,
+        "unit": unit,
+        "api_calls": {name: calls_after[name] - calls_before[name] for name in calls_after
+                      if calls_after[name] != calls_before[name]},
+        "peak_rss_mb": pipeline.peak_rss_mb(),
+    }
+
+def summarize(raw, iterations):
+    latencies = raw["latencies"]
+    total_calls = sum(raw["api_calls"].values())
+    return {
+        "unit": raw["unit"],
+        "throughput": round(raw["units"] * len(latencies) / sum(latencies), 2) if sum(latencies) else None,
+        "p50_ms": round(1000 * percentile(latencies, 50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 95), 2),
+        "peak_rss_mb": raw["peak_rss_mb"],
+        "api_calls": round(total_calls / iterations, 2),
+        "api_calls_by_service": {name: round(count / iterations, 2) for name, count in raw["api_calls"].items()},
+    }
+
+def compare(results, baseline, tolerance):
+    """Per-case regressions: slower p50/p95, lower throughput or higher RSS beyond tolerance, or more API calls."""
+    regressions = {}
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base or "error" in result or "error" in base:
+            continue
+        problems = []
+        for metric in ("p50_ms", "p95_ms", "peak_rss_mb"):
+            if base.get(metric) and result[metric] > base[metric] * (1 + tolerance):
+                problems.append(f"{metric} {base[metric]} -> {result[metric]}")
+        if base.get("throughput") and result["throughput"] < base["throughput"] / (1 + tolerance):
+            problems.append(f"throughput {base['throughput']} -> {result['throughput']}")
+        if result["api_calls"] > base["api_calls"]:
+            problems.append(f"api_calls {base['api_calls']} -> {result['api_calls']}")
+        if problems:
+            regressions[key] = problems
+    return regressions
+
+def print_report(results, baseline):
+    header = f"{'case':<34}{'throughput':>18}{'p50 ms':>11}{'p95 ms':>11}{'RSS MB':>9}{'calls':>9}{'p95 vs base':>13}"
+    print(header)
+    print("-" * len(header))
+    for key, result in results.items():
+        if "error" in result:
+            print(f"{key:<34}  error: {result['error']}")
+            continue
+        base = baseline.get(key) or {}
+        delta = f"{100 * (result['p95_ms'] / base['p95_ms'] - 1):+.0f}%" if base.get("p95_ms") else "-"
+        throughput = f"{result['throughput']} {result['unit']}/s"
+        print(f"{key:<34}{throughput:>18}{result['p50_ms']:>11}{result['p95_ms']:>11}{result['peak_rss_mb'] or '-':>9}"
+              f"{result['api_calls']:>9}{delta:>13}")
+
+def parse_sizes(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the meeting pipeline stages.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of: " + ", ".join(STAGES))
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--audio-seconds", type=parse_sizes, default=[30, 300, 1800])
+    parser.add_argument("--repo-files", type=parse_sizes, default=[10, 1000, 10000])
+    parser.add_argument("--transcript-tokens", type=parse_sizes, default=[2000, 20000])
+    parser.add_argument("--findings", type=parse_sizes, default=[10, 1000])
+    parser.add_argument("--asana-tasks", type=parse_sizes, default=[10, 100])
+    parser.add_argument("--email-recipients", type=parse_sizes, default=[10, 100])
+    parser.add_argument("--github-latency-ms", type=float, default=20)
+    parser.add_argument("--groq-latency-ms", type=float, default=300)
+    parser.add_argument("--asana-latency-ms", type=float, default=50)
+    parser.add_argument("--asana-429-every", type=int, default=0, help="rate-limit every Nth Asana task creation")
+    parser.add_argument("--smtp-latency-ms", type=float, default=20)
+    parser.add_argument("--stt-latency-ms", type=float, default=200)
+    parser.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "pipeline-bench-fixtures"))
+    parser.add_argument("--output", default=os.path.join(BENCHMARK_DIR, "results.json"))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown before flagging")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    stages = [s for s in args.stages.split(',') if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    sizes = {"extract_audio": args.audio_seconds, "speech_to_text": args.audio_seconds,
+             "get_github_files": args.repo_files, "get_github_files_warm": args.repo_files,
+             "analyze_with_groq": args.transcript_tokens, "add_comments_to_code": args.findings,
+             "publish_review_commit": args.findings, "publish_pull_request_review": args.findings,
+             "process_all_asana_tasks": args.asana_tasks, "send_summary_emails": args.email_recipients}
+    os.makedirs(args.fixture_dir, exist_ok=True)
+
+    github = MockGitHub(args.github_latency_ms / 1000).start()
+    groq = MockGroq(args.groq_latency_ms / 1000).start()
+    asana = MockAsana(args.asana_latency_ms / 1000, rate_limit_every=args.asana_429_every).start()
+    if {"get_github_files", "get_github_files_warm"} & set(stages):
+        for n_files in args.repo_files:
+            github.add_repository("bench", f"repo-{n_files}", make_repository(n_files))
+    if set(PUBLISH_API_CALL_BOUNDS) & set(stages):
+        github.add_repository(*PUBLISH_REPO, make_repository(10))
+    service_urls = {"github": github.url, "groq": groq.url, "asana": asana.url}
+    # Worker processes inherit these, so pipeline talks to the stand-ins
+    os.environ.update(GITHUB_API_URL=github.url, GITHUB_RAW_URL=github.url, GROQ_BASE_URL=groq.url,
+                      GROQ_API_KEY="bench", ASANA_API_URL=asana.url,
+                      APP_CACHE_DIR=tempfile.mkdtemp(prefix="pipeline-bench-cache-"))
+
+    results = {}
+    try:
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            for size in sizes[stage]:
+                key = f"{stage}[{size}]"
+                print(f"running {key}...", file=sys.stderr, flush=True)
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    future = executor.submit(run_case, stage, size, args.iterations, args.warmup, args.fixture_dir,
+                                             args.stt_latency_ms / 1000, service_urls, args.smtp_latency_ms / 1000)
+                    try:
+                        results[key] = summarize(future.result(), args.iterations)
+                    except Exception as e:
+                        results[key] = {"error": str(e)}
+    finally:
+        for service in (github, groq, asana):
+            service.stop()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    elif not args.save_baseline:
+        print(f"No baseline at {args.baseline}; record one on this machine with --save-baseline "
+              "before regressions can be detected.", file=sys.stderr)
+    print_report(results, baseline)
+    regressions = compare(results, baseline, args.tolerance)
+    for key, problems in regressions.items():
+        print(f"REGRESSION {key}: {'; '.join(problems)}")
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "settings": vars(args),
+              "results": results, "regressions": regressions}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+    if args.fail_on_regression and not baseline and not args.save_baseline:
+        return 2
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
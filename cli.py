@@ -0,0 +1,148 @@
+"""
+Headless batch processing of meeting recordings and transcripts.
+
+    python cli.py recordings/ --output-dir summaries/ --workers 4
+    python cli.py manifest.jsonl --output-dir summaries/ --archive
+
+The input is a directory of media files (mp4, mp3, wav) and transcripts (txt, md), or a
+manifest: a JSON list or JSON Lines file of {"path", "id", "repo_url", "branch"} entries,
+with paths relative to the manifest. Each meeting's summary_data is written to
+<output-dir>/<id>.json.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pipeline import (PipelineProgress, SUPPORTED_MEDIA_EXTENSIONS, get_llm_cache, get_meeting_archive,
+                      get_repo_file_cache, get_transcription_backend, run_processing_job)
+
+TRANSCRIPT_EXTENSIONS = ['txt', 'md']
+
+logger = logging.getLogger("cli")
+
+class LoggingProgress(PipelineProgress):
+    """Logs a run's stages and warnings, prefixed with the meeting id."""
+
+    def __init__(self, meeting_id):
+        super().__init__()
+        self.meeting_id = meeting_id
+
+    def stage(self, name, progress, detail="", throttle=False):
+        if not throttle:
+            logger.info("%s: %s %s", self.meeting_id, name, detail)
+
+    def warn(self, message):
+        super().warn(message)
+        logger.warning("%s: %s", self.meeting_id, message)
+
+def file_extension(path):
+    return os.path.splitext(path)[1].lstrip('.').lower()
+
+def discover_inputs(source):
+    """List {"path", "id", ...} entries from a directory or a manifest file."""
+    if os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source)
+                       if file_extension(n) in SUPPORTED_MEDIA_EXTENSIONS + TRANSCRIPT_EXTENSIONS)
+        entries = [{"path": os.path.join(source, n)} for n in names]
+    else:
+        with open(source, encoding='utf-8') as f:
+            content = f.read().strip()
+        if content.startswith('['):
+            entries = json.loads(content)
+        else:
+            entries = [json.loads(line) for line in content.splitlines() if line.strip()]
+        base = os.path.dirname(os.path.abspath(source))
+        for entry in entries:
+            entry["path"] = os.path.join(base, entry["path"])
+    for entry in entries:
+        entry.setdefault("id", os.path.splitext(os.path.basename(entry["path"]))[0])
+    ids = [entry["id"] for entry in entries]
+    duplicates = sorted({i for i in ids if ids.count(i) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate meeting ids (set \"id\" in the manifest): {', '.join(duplicates)}")
+    return entries
+
+def process_entry(entry, options):
+    """
+    Run the pipeline on one recording or transcript and write its summary_data JSON.
+    Runs in a worker process, so it takes and returns plain data only.
+    """
+    started = time.perf_counter()
+    path = entry["path"]
+    job = LoggingProgress(entry["id"])
+    inputs = {
+        "repo_url": entry.get("repo_url", options["repo_url"]),
+        "branch": entry.get("branch", options["branch"]),
+        "github_token": options["github_token"],
+        "repo_cache": get_repo_file_cache(),
+        "llm_cache": None if options["no_cache"] else get_llm_cache(),
+        "backend": None,
+        "direct_text": "",
+        "uploaded_file": None,
+    }
+    if file_extension(path) in TRANSCRIPT_EXTENSIONS:
+        with open(path, encoding='utf-8') as f:
+            inputs["direct_text"] = f.read()
+        result, _, _ = run_processing_job(job, inputs)
+    else:
+        # Only recordings need a speech backend; transcripts never load one
+        inputs["backend"] = get_transcription_backend(options["backend"])
+        with open(path, 'rb') as media:
+            inputs["uploaded_file"] = media
+            result, _, _ = run_processing_job(job, inputs)
+
+    output_path = os.path.join(options["output_dir"], f"{entry['id']}.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result["summary_data"], f, indent=2)
+    if options["archive"]:
+        get_meeting_archive().save(entry["id"], result["text"], result["summary_data"], inputs["repo_url"],
+                                   os.path.basename(path))
+    return {"id": entry["id"], "output": output_path, "seconds": round(time.perf_counter() - started, 2),
+            "token_usage": result["token_usage"], "warnings": result["warnings"]}
+
+def run_batch(entries, options, workers):
+    """Process entries on a pool of worker processes, yielding one report per entry as it finishes."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_entry, entry, options): entry for entry in entries}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {"id": futures[future]["id"], "error": str(e)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize meeting recordings and transcripts without the web UI.")
+    parser.add_argument("source", help="directory of recordings/transcripts, or a JSON/JSON Lines manifest")
+    parser.add_argument("-o", "--output-dir", default="summaries", help="where <id>.json files are written")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="number of worker processes")
+    parser.add_argument("--repo-url", default="", help="GitHub repository used for entries that don't set one")
+    parser.add_argument("--branch", default="main")
+    parser.add_argument("--github-token", default=os.getenv("GITHUB_TOKEN", ""))
+    parser.add_argument("--backend", default=None, help="transcription backend (google, whisper)")
+    parser.add_argument("--skip-existing", action="store_true", help="skip entries whose output already exists")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the LLM response cache")
+    parser.add_argument("--archive", action="store_true", help="also save each meeting to the meeting archive")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr)
+
+    entries = discover_inputs(args.source)
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.skip_existing:
+        entries = [e for e in entries if not os.path.exists(os.path.join(args.output_dir, f"{e['id']}.json"))]
+    options = {"output_dir": args.output_dir, "repo_url": args.repo_url, "branch": args.branch,
+               "github_token": args.github_token, "backend": args.backend, "no_cache": args.no_cache,
+               "archive": args.archive}
+
+    failed = 0
+    for report in run_batch(entries, options, max(1, args.workers)):
+        failed += "error" in report
+        print(json.dumps(report), flush=True)
+    logger.info("Processed %d meetings, %d failed", len(entries), failed)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3077 @@
+"""UI-free meeting processing pipeline shared by the Streamlit app and the batch CLI."""
+import time
+PIPELINE_IMPORT_STARTED = time.perf_counter()
+import os
+import sys
+import logging
+import importlib
+import tempfile
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import json
+import uuid
+import smtplib
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import parseaddr, parsedate_to_datetime
+import html
+import string
+from dotenv import load_dotenv
+import re
+import zipfile
+import math
+import stat
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from urllib.parse import quote, urlsplit
+import hashlib
+import threading
+import contextvars
+from functools import lru_cache
+from contextlib import contextmanager
+from collections import OrderedDict, deque
+from bisect import bisect_left, bisect_right
+from array import array
+from itertools import accumulate
+import difflib
+import shutil
+import subprocess
+import sqlite3
+import zlib
+
+# Load environment variables (e.g., GROQ_API_KEY)
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Heavy dependencies (speech_recognition, groq/httpx, numpy, scikit-learn) are imported
+# on first use through lazy_import, so pasting a transcript never loads the media stacks
+LAZY_IMPORT_SECONDS = {}
+
+def lazy_import(module_name):
+    """Import a module on first use and record how long the first import took."""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    LAZY_IMPORT_SECONDS[module_name] = round(time.perf_counter() - started, 3)
+    return module
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def startup_profile():
+    """Import time of this module, first-use import time of each lazily loaded module, and peak RSS."""
+    return {
+        "pipeline_import_seconds": PIPELINE_IMPORT_SECONDS,
+        "lazy_imports": dict(LAZY_IMPORT_SECONDS),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+# Local storage for caches (repository files, etc.)
+APP_CACHE_DIR = os.getenv("APP_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "code-review-summarizer")
+
+# --------------------------------------------------------------------
+# Telemetry
+# --------------------------------------------------------------------
+
+TELEMETRY_MAX_SPANS = int(os.getenv("TELEMETRY_MAX_SPANS", "2000"))
+TELEMETRY_SERVICE_NAME = "code-review-summarizer"
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def otlp_attributes(attributes):
+    def value(v):
+        if isinstance(v, bool):
+            return {"boolValue": v}
+        if isinstance(v, int):
+            return {"intValue": str(v)}
+        if isinstance(v, float):
+            return {"doubleValue": v}
+        return {"stringValue": str(v)}
+    return [{"key": k, "value": value(v)} for k, v in attributes.items() if v is not None]
+
+class Telemetry:
+    """
+    Process-wide spans, counters and duration histograms for the pipeline.
+    Spans nest through a context variable (thread pools pass it on with
+    submit_in_context); finished spans are kept in a ring of max_spans. Counters and
+    histograms are keyed by metric name and label set, and every span also feeds the
+    span_duration_seconds histogram. Exported as Prometheus text or OTLP/JSON.
+    """
+
+    def __init__(self, max_spans):
+        self.started = time.time()
+        self.spans = deque(maxlen=max_spans)
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.setdefault(key, {"counts": [0] * (len(HISTOGRAM_BUCKETS) + 1),
+                                                         "sum": 0.0, "count": 0})
+            histogram["counts"][bisect_left(HISTOGRAM_BUCKETS, seconds)] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+
+    def _new_span(self, name, attributes):
+        parent = _current_span.get()
+        return {"trace_id": parent["trace_id"] if parent else uuid.uuid4().hex, "span_id": uuid.uuid4().hex[:16],
+                "parent_id": parent["span_id"] if parent else None, "name": name, "attributes": attributes,
+                "status": "ok"}
+
+    def _finish(self, span, started):
+        span["seconds"] = time.perf_counter() - started
+        span["end"] = time.time()
+        span["start"] = span["end"] - span["seconds"]
+        with self._lock:
+            self.spans.append(span)
+        self.observe("span_duration_seconds", span["seconds"], span=span["name"])
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time the enclosed block as a child of the current span; yields the span so attributes can be added."""
+        span = self._new_span(name, attributes)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span["status"] = "error"
+            span["attributes"]["error"] = str(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span, started)
+
+    def record_span(self, name, started, **attributes):
+        """Record an already finished span; started is the time.perf_counter() value it began at."""
+        self._finish(self._new_span(name, attributes), started)
+
+    def recent_spans(self, limit=None):
+        with self._lock:
+            spans = list(self.spans)
+        return spans[-limit:] if limit else spans
+
+    def metrics(self):
+        with self._lock:
+            return dict(self.counters), {k: dict(v, counts=list(v["counts"])) for k, v in self.histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def prometheus_text(self):
+        counters, histograms = self.metrics()
+        lines = []
+
+        def labels_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{labels_text(labels)} {value}")
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = list(accumulate(histogram["counts"]))
+                for bound, count in zip(HISTOGRAM_BUCKETS, cumulative):
+                    lines.append(f"{name}_bucket{labels_text(labels, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{labels_text(labels, [('le', '+Inf')])} {histogram['count']}")
+                lines.append(f"{name}_sum{labels_text(labels)} {histogram['sum']}")
+                lines.append(f"{name}_count{labels_text(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def _resource(self):
+        return {"attributes": otlp_attributes({"service.name": TELEMETRY_SERVICE_NAME})}
+
+    def otlp_traces(self):
+        """Finished spans as an OTLP/JSON ExportTraceServiceRequest."""
+        spans = [{
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            **({"parentSpanId": span["parent_id"]} if span["parent_id"] else {}),
+            "name": span["name"],
+            "kind": 3 if span["name"].startswith(("http.", "llm.")) else 1,  # CLIENT or INTERNAL
+            "startTimeUnixNano": str(int(span["start"] * 1e9)),
+            "endTimeUnixNano": str(int(span["end"] * 1e9)),
+            "attributes": otlp_attributes(span["attributes"]),
+            "status": {"code": 2 if span["status"] == "error" else 1},
+        } for span in self.recent_spans()]
+        return {"resourceSpans": [{"resource": self._resource(),
+                                   "scopeSpans": [{"scope": {"name": "pipeline"}, "spans": spans}]}]}
+
+    def otlp_metrics(self):
+        """Counters (cumulative sums) and histograms as an OTLP/JSON ExportMetricsServiceRequest."""
+        counters, histograms = self.metrics()
+        start, now = str(int(self.started * 1e9)), str(int(time.time() * 1e9))
+        metrics = {}
+        for (name, labels), value in sorted(counters.items()):
+            metric = metrics.setdefault(name, {"name": name, "sum": {
+                "aggregationTemporality": 2, "isMonotonic": True, "dataPoints": []}})
+            point = {"attributes": otlp_attributes(dict(labels)), "startTimeUnixNano": start, "timeUnixNano": now}
+            point.update({"asInt": str(value)} if isinstance(value, int) else {"asDouble": value})
+            metric["sum"]["dataPoints"].append(point)
+        for (name, labels), histogram in sorted(histograms.items()):
+            metric = metrics.setdefault(name, {"name": name, "unit": "s", "histogram": {
+                "aggregationTemporality": 2, "dataPoints": []}})
+            metric["histogram"]["dataPoints"].append({
+                "attributes": otlp_attributes(dict(labels)), "startTimeUnixNano": start, "timeUnixNano": now,
+                "count": str(histogram["count"]), "sum": histogram["sum"],
+                "bucketCounts": [str(c) for c in histogram["counts"]], "explicitBounds": list(HISTOGRAM_BUCKETS)})
+        return {"resourceMetrics": [{"resource": self._resource(),
+                                     "scopeMetrics": [{"scope": {"name": "pipeline"}, "metrics": list(metrics.values())}]}]}
+
+@lru_cache(maxsize=None)
+def get_telemetry():
+    """Process-wide telemetry shared by every session, job and thread."""
+    return Telemetry(TELEMETRY_MAX_SPANS)
+
+def submit_in_context(executor, fn, *args):
+    """executor.submit that runs fn inside the caller's context, so its spans nest under the current span."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+# --------------------------------------------------------------------
+# Shared Connections
+# --------------------------------------------------------------------
+
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", "120"))
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with a default (connect, read) timeout and per-session request statistics.
+    Every request is an http.<service> span; response bytes are counted from Content-Length.
+    """
+
+    def __init__(self, stats, *args, service="http", **kwargs):
+        self.stats = stats
+        self.service = service
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        telemetry = get_telemetry()
+        started = time.perf_counter()
+        with telemetry.span(f"http.{self.service}", method=request.method,
+                            path=urlsplit(request.url).path) as span:
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                telemetry.inc("http_errors_total", service=self.service)
+                raise
+            retries = getattr(response.raw, "retries", None)
+            retry_count = len(retries.history) if retries else 0
+            size = int(response.headers.get("Content-Length") or 0)
+            span["attributes"].update(status=response.status_code, bytes=size, retries=retry_count)
+        elapsed = time.perf_counter() - started
+        telemetry.inc("http_requests_total", service=self.service, status=response.status_code)
+        telemetry.inc("http_response_bytes_total", size, service=self.service)
+        if retry_count:
+            telemetry.inc("http_retries_total", retry_count, service=self.service)
+        telemetry.observe("http_request_duration_seconds", elapsed, service=self.service)
+        with self.stats["lock"]:
+            self.stats["requests"] += 1
+            self.stats["seconds"] += elapsed
+            self.stats["retries"] += retry_count
+        return response
+
+def create_http_session(pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=HTTP_MAX_RETRIES, service="http"):
+    """
+    Build a keep-alive requests.Session with a sized connection pool, default timeouts and
+    retry/backoff on 429 and 5xx (honouring Retry-After). POSTs are never retried here,
+    since they are not idempotent. Credentials are passed per request, never stored on
+    the session, so one session can be shared by every user of the app.
+    """
+    retry = Retry(total=max_retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+                  respect_retry_after_header=True, raise_on_status=False)
+    stats = {"lock": threading.Lock(), "requests": 0, "seconds": 0.0, "retries": 0}
+    adapter = PooledHTTPAdapter(stats, pool_connections=8, pool_maxsize=pool_maxsize, max_retries=retry,
+                                service=service)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.stats = stats
+    return session
+
+@lru_cache(maxsize=None)
+def get_http_session(service):
+    """Process-wide pooled session for one service ("github", "asana"), surviving reruns."""
+    return create_http_session(pool_maxsize=max(HTTP_POOL_MAXSIZE, GITHUB_FETCH_WORKERS), service=service)
+
+@lru_cache(maxsize=None)
+def get_groq_client():
+    """Process-wide Groq client; its httpx pool keeps connections alive between calls."""
+    httpx = lazy_import("httpx")
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=HTTP_POOL_MAXSIZE, max_keepalive_connections=HTTP_POOL_MAXSIZE),
+        timeout=GROQ_TIMEOUT_SECONDS,
+    )
+    # GROQ_BASE_URL points the client at a proxy or a local stand-in server
+    return lazy_import("groq").Groq(api_key=os.getenv("GROQ_API_KEY"), base_url=os.getenv("GROQ_BASE_URL") or None,
+                                    max_retries=GROQ_MAX_RETRIES, timeout=GROQ_TIMEOUT_SECONDS,
+                                    http_client=http_client)
+
+def measure_connection_reuse(url, requests_count=5, headers=None):
+    """
+    Time requests_count GETs to url on fresh connections versus one pooled session and
+    return the average latency saved per request by connection reuse (TCP + TLS setup).
+    """
+    cold = []
+    for _ in range(requests_count):
+        with requests.Session() as fresh:
+            started = time.perf_counter()
+            fresh.get(url, headers=headers, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+            cold.append(time.perf_counter() - started)
+
+    warm = []
+    with create_http_session(max_retries=0) as pooled:
+        pooled.get(url, headers=headers)  # open the connection once
+        for _ in range(requests_count):
+            started = time.perf_counter()
+            pooled.get(url, headers=headers)
+            warm.append(time.perf_counter() - started)
+
+    cold_ms = 1000 * sum(cold) / len(cold)
+    warm_ms = 1000 * sum(warm) / len(warm)
+    return {"fresh_connection_ms": round(cold_ms, 1), "pooled_connection_ms": round(warm_ms, 1),
+            "saved_per_request_ms": round(cold_ms - warm_ms, 1)}
+
+# --------------------------------------------------------------------
+# GitHub Integration Functions
+# --------------------------------------------------------------------
+
+# Overridable so the integration can run against a mock or GitHub Enterprise server
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip('/')
+GITHUB_RAW_URL = os.getenv("GITHUB_RAW_URL", "https://raw.githubusercontent.com").rstrip('/')
+GITHUB_FETCH_WORKERS = int(os.getenv("GITHUB_FETCH_WORKERS", "16"))
+GITHUB_EXCLUDED_DIRS = ["node_modules", ".git", "pycache", "dist", "build"]
+GITHUB_EXCLUDED_EXTENSIONS = [".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".woff", ".ttf"]
+REPO_CACHE_MAX_MB = int(os.getenv("REPO_CACHE_MAX_MB", "512"))
+
+# Git tree entry modes; only regular files are rewritten when publishing review comments
+GIT_FILE_MODE = "100644"
+GIT_EXECUTABLE_MODE = "100755"
+GIT_SYMLINK_MODE = "120000"
+
+def parse_github_repo_url(repo_url):
+    """Return (owner, repo) from a GitHub URL, or None if the URL is malformed."""
+    clean_url = repo_url.rstrip('/')
+    if clean_url.endswith('.git'):
+        clean_url = clean_url[:-4]
+
+    repo_parts = clean_url.split('github.com/')[-1].split('/')
+    if len(repo_parts) < 2:
+        return None
+    return repo_parts[0], repo_parts[1]
+
+def is_excluded_file(path):
+    """Skip vendored/build directories and binary assets when fetching a repository."""
+    for dir_name in GITHUB_EXCLUDED_DIRS:
+        if f"/{dir_name}/" in path or path.startswith(f"{dir_name}/"):
+            return True
+    for ext in GITHUB_EXCLUDED_EXTENSIONS:
+        if path.endswith(ext):
+            return True
+    return False
+
+def git_blob_sha(data):
+    """Compute the git object id of a blob, matching the SHAs in the Trees API."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+class RepoFileCache:
+    """
+    Content-addressed on-disk cache of repository files.
+    Blobs are stored by git blob SHA and evicted least-recently-used once the store
+    exceeds max_bytes. A separate ref index maps "owner/repo@branch" to the last seen
+    commit, its ETag and the {path: blob_sha} listing of that commit.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.blob_dir = os.path.join(root, "blobs")
+        self.ref_dir = os.path.join(root, "refs")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.ref_dir, exist_ok=True)
+
+        # Rebuild the LRU order from file modification times (touched on every hit)
+        entries = []
+        for dirpath, _, filenames in os.walk(self.blob_dir):
+            for name in filenames:
+                stat = os.stat(os.path.join(dirpath, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+        self._lru = OrderedDict((name, size) for _, name, size in sorted(entries))
+        self.total_bytes = sum(self._lru.values())
+
+    def _blob_path(self, sha):
+        return os.path.join(self.blob_dir, sha[:2], sha)
+
+    def _ref_path(self, ref_key):
+        return os.path.join(self.ref_dir, hashlib.sha1(ref_key.encode()).hexdigest() + ".json")
+
+    def get_blob(self, sha):
+        with self._lock:
+            if sha not in self._lru:
+                self.misses += 1
+                get_telemetry().inc("cache_lookups_total", cache="repo_files", result="miss")
+                return None
+            path = self._blob_path(sha)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                self.total_bytes -= self._lru.pop(sha)
+                self.misses += 1
+                get_telemetry().inc("cache_lookups_total", cache="repo_files", result="miss")
+                return None
+            self._lru.move_to_end(sha)
+            self.hits += 1
+            get_telemetry().inc("cache_lookups_total", cache="repo_files", result="hit")
+            return data
+
+    def put_blob(self, sha, data):
+        with self._lock:
+            if sha in self._lru:
+                return
+            path = self._blob_path(sha)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._lru[sha] = len(data)
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes and len(self._lru) > 1:
+                old_sha, size = self._lru.popitem(last=False)
+                self.total_bytes -= size
+                self.evictions += 1
+                try:
+                    os.unlink(self._blob_path(old_sha))
+                except OSError:
+                    pass
+
+    def get_ref(self, ref_key):
+        try:
+            with open(self._ref_path(ref_key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put_ref(self, ref_key, etag, commit_sha, blobs, modes):
+        path = self._ref_path(ref_key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"etag": etag, "commit_sha": commit_sha, "files": blobs, "modes": modes}, f)
+        os.replace(tmp_path, path)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "blobs": len(self._lru),
+            "size_mb": round(self.total_bytes / (1024 * 1024), 2),
+        }
+
+@lru_cache(maxsize=None)
+def get_repo_file_cache():
+    """Process-wide repository file cache, shared across sessions and reruns."""
+    return RepoFileCache(os.path.join(APP_CACHE_DIR, "repo_files"), REPO_CACHE_MAX_MB * 1024 * 1024)
+
+def github_headers(github_token):
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if github_token:
+        headers["Authorization"] = f"token {github_token}"
+    return headers
+
+def zip_entry_mode(info):
+    """Git file mode of a zipball entry, from the unix permissions in its external attributes."""
+    unix_mode = info.external_attr >> 16
+    if stat.S_ISLNK(unix_mode):
+        return GIT_SYMLINK_MODE
+    return GIT_EXECUTABLE_MODE if unix_mode & 0o111 else GIT_FILE_MODE
+
+def download_github_zipball(session, headers, owner, repo, commit_sha, progress_callback=None):
+    """
+    Download the whole repository at commit_sha as one zipball.
+    Used when the recursive tree listing is truncated (very large repositories).
+    Returns ({path: bytes}, {path: blob_sha}, {path: mode}) where modes only lists
+    entries that are not plain files.
+    """
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/zipball/{commit_sha}"
+    contents = {}
+    blobs = {}
+    modes = {}
+    with session.get(url, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as archive:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                archive.write(chunk)
+            archive.seek(0)
+            with zipfile.ZipFile(archive) as zf:
+                # Every entry is prefixed with a "<owner>-<repo>-<sha>/" directory
+                members = []
+                for info in zf.infolist():
+                    if info.is_dir():
+                        continue
+                    path = info.filename.split('/', 1)[-1]
+                    if path and not is_excluded_file(path):
+                        members.append((path, info))
+                for done, (path, info) in enumerate(members, start=1):
+                    started = time.perf_counter()
+                    contents[path] = zf.read(info)
+                    blobs[path] = git_blob_sha(contents[path])
+                    if zip_entry_mode(info) != GIT_FILE_MODE:
+                        modes[path] = zip_entry_mode(info)
+                    if progress_callback:
+                        progress_callback(done, len(members), path, time.perf_counter() - started)
+    return contents, blobs, modes
+
+def decode_file(path, data, undecodable):
+    """Decode fetched bytes as UTF-8, recording path in undecodable when they are not clean UTF-8."""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        undecodable.add(path)
+        return data.decode('utf-8', errors='replace')
+
+def get_github_files(repo_url, branch, github_token, progress_callback=None, cache=None, snapshot=None,
+                     previous=None):
+    """
+    Fetch file content from a GitHub repository.
+    Handles duplicate file names by using full relative paths.
+
+    The branch is resolved to a commit, the whole file listing comes from a single
+    recursive Git Trees call and blobs are downloaded concurrently on the pooled session.
+    progress_callback(done, total, path, seconds) is invoked from the calling thread
+    after each file download completes.
+
+    With a RepoFileCache, the branch lookup is a conditional request: an unchanged
+    branch costs one 304 and no downloads, a new commit only downloads changed blobs.
+
+    A snapshot dict, when given, is filled with the fetched "commit_sha", the git
+    "modes" of entries that are not plain 100644 files and the sorted "undecodable"
+    paths whose content was not valid UTF-8 (decoded with replacement characters).
+    previous may be the (snapshot, files_dict) of an earlier fetch of the same branch:
+    when the branch still points at that commit its files are returned as they are,
+    without reading the tree or any blobs.
+    """
+    parsed = parse_github_repo_url(repo_url)
+    if not parsed:
+        return None, "Invalid GitHub URL format"
+
+    owner, repo = parsed
+    ref_key = f"{owner}/{repo}@{branch or 'HEAD'}"
+    session = get_http_session("github")
+    headers = github_headers(github_token)
+
+    try:
+        cached_ref = cache.get_ref(ref_key) if cache else None
+        # Refs cached before modes were recorded are refetched once
+        if cached_ref and "modes" not in cached_ref:
+            cached_ref = None
+        conditional = {"If-None-Match": cached_ref["etag"]} if cached_ref and cached_ref.get("etag") else {}
+        response = session.get(f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits/{branch or 'HEAD'}",
+                               headers={**headers, **conditional})
+        if response.status_code == 404:
+            return None, f"Repository not found: {owner}/{repo}"
+
+        if response.status_code == 304:
+            commit_sha = cached_ref["commit_sha"]
+        else:
+            response.raise_for_status()
+            etag = response.headers.get("ETag")
+            commit = response.json()
+            commit_sha = commit["sha"]
+        if previous and previous[0].get("commit_sha") == commit_sha:
+            if snapshot is not None:
+                snapshot.update(previous[0])
+            return previous[1], None
+
+        files_dict = {}
+        undecodable = set()
+        if response.status_code == 304:
+            blobs = cached_ref["files"]
+            modes = cached_ref["modes"]
+        else:
+            tree_sha = commit["commit"]["tree"]["sha"]
+
+            response = session.get(f"{GITHUB_API_URL}/repos/{owner}/{repo}/git/trees/{tree_sha}?recursive=1",
+                                   headers=headers)
+            response.raise_for_status()
+            tree = response.json()
+            if tree.get("truncated"):
+                contents, blobs, modes = download_github_zipball(session, headers, owner, repo, commit_sha,
+                                                                 progress_callback)
+                for path, data in contents.items():
+                    files_dict[path] = decode_file(path, data, undecodable)
+                    if cache:
+                        cache.put_blob(blobs[path], data)
+            else:
+                entries = [item for item in tree.get("tree", [])
+                           if item["type"] == "blob" and not is_excluded_file(item["path"])]
+                blobs = {item["path"]: item["sha"] for item in entries}
+                modes = {item["path"]: item["mode"] for item in entries
+                         if item.get("mode", GIT_FILE_MODE) != GIT_FILE_MODE}
+
+        missing = []
+        for path, sha in blobs.items():
+            if path in files_dict:
+                continue
+            data = cache.get_blob(sha) if cache else None
+            if data is None:
+                missing.append(path)
+            else:
+                files_dict[path] = decode_file(path, data, undecodable)
+
+        def fetch_blob(path):
+            started = time.perf_counter()
+            url = f"{GITHUB_RAW_URL}/{owner}/{repo}/{commit_sha}/{quote(path)}"
+            file_response = session.get(url, headers=headers)
+            file_response.raise_for_status()
+            return file_response.content, time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=GITHUB_FETCH_WORKERS) as executor:
+            futures = {submit_in_context(executor, fetch_blob, path): path for path in missing}
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                data, elapsed = future.result()
+                files_dict[path] = decode_file(path, data, undecodable)
+                if cache:
+                    cache.put_blob(blobs[path], data)
+                if progress_callback:
+                    progress_callback(done, len(missing), path, elapsed)
+
+        if cache and response.status_code != 304:
+            cache.put_ref(ref_key, etag, commit_sha, blobs, modes)
+        if snapshot is not None:
+            snapshot.update(commit_sha=commit_sha, modes=modes, undecodable=sorted(undecodable))
+        return files_dict, None
+    except requests.exceptions.RequestException as e:
+        return None, f"GitHub API error: {str(e)}"
+    except Exception as e:
+        return None, f"Error fetching repository: {str(e)}"
+
+def update_github_comments(repo_url, branch, github_token, comment_body):
+    """
+    Update GitHub with meeting insights.
+    This function creates an issue with the meeting summary.
+    """
+    parsed = parse_github_repo_url(repo_url)
+    if not parsed:
+        return False
+    owner, repo = parsed
+
+    # Create an issue with the meeting summary
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/issues"
+    data = {
+        "title": "Automated Code Review Meeting Summary",
+        "body": comment_body
+    }
+    response = get_http_session("github").post(url, headers=github_headers(github_token), json=data)
+    return response.status_code == 201
+
+SYMBOL_PATTERN = re.compile(
+    r'^[ \t]*(?:export\s+)?(?:async\s+)?(?:def|class|function|func|fn|interface|struct)\s+([A-Za-z_]\w*)', re.M)
+
+LINE_REF_PATTERN = re.compile(r'\s*(?:lines?\s*|L)?(\d+)(?:\s*-\s*L?\d+)?\s*', re.I)
+
+class FileIndex:
+    """
+    Line and symbol index over one fetched file, built once at fetch time.
+    offsets[i] is the character offset where line i + 1 starts; symbols maps the
+    lowercased name of each function/class definition to its first line.
+    """
+
+    def __init__(self, content):
+        self.offsets = array('q', accumulate((len(line) + 1 for line in content.split('\n')), initial=0))
+        self.offsets.pop()
+        self.symbols = {}
+        for match in SYMBOL_PATTERN.finditer(content):
+            self.symbols.setdefault(match.group(1).lower(), self.line_at(match.start(1)))
+
+    @property
+    def line_count(self):
+        return len(self.offsets)
+
+    def line_at(self, offset):
+        """1-based line containing a character offset."""
+        return bisect_right(self.offsets, offset)
+
+    def resolve(self, line_ref):
+        """
+        1-based line for a feedback line_number: an int, "12", "L12", "line 12", a range
+        such as "10-15" (its start), or a symbol name such as "validate_password" or
+        "SessionManager.login()". A number is only taken when it is the whole value, so
+        free text like "2023 release" is not read as a line. Returns None when nothing matches.
+        """
+        if isinstance(line_ref, bool) or not isinstance(line_ref, (int, str)):
+            return None
+        if isinstance(line_ref, int):
+            return line_ref if line_ref > 0 else None
+        number = LINE_REF_PATTERN.fullmatch(line_ref)
+        if number:
+            return int(number.group(1)) or None
+        # Prefer the most specific (last) name, e.g. the method in "Class.method"
+        for name in reversed(re.findall(r'[A-Za-z_]\w*', line_ref)):
+            if name.lower() in self.symbols:
+                return self.symbols[name.lower()]
+        return None
+
+def build_file_indexes(files_dict):
+    """Index every fetched file; maps path -> FileIndex."""
+    return {path: FileIndex(content) for path, content in files_dict.items()}
+
+def group_feedback_by_file(feedback_items, file_index):
+    """
+    Map each indexed path to its feedback items in one pass. File names from the model
+    are matched exactly, then without a leading "./" or "/", then by a unique path suffix.
+    """
+    by_name = {}
+    for path in file_index:
+        by_name.setdefault(path.rsplit('/', 1)[-1], []).append(path)
+    grouped = {}
+    for item in feedback_items or []:
+        name = str(item.get('file') or '').strip()
+        relative = re.sub(r'^(?:\./|/)+', '', name)
+        path = name if name in file_index else relative if relative in file_index else None
+        if path is None and relative:
+            candidates = [p for p in by_name.get(relative.rsplit('/', 1)[-1], []) if p.endswith(relative)]
+            path = candidates[0] if len(candidates) == 1 else None
+        if path is not None:
+            grouped.setdefault(path, []).append(item)
+    return grouped
+
+# (prefix, suffix) of a one-line comment, by file extension or, for extensionless files, name
+COMMENT_SYNTAX = {name: syntax for syntax, names in {
+    ("// ", ""): "c h cc cpp cxx hpp cs java js jsx mjs cjs ts tsx go rs swift kt kts scala php dart groovy",
+    ("# ", ""): "py pyw rb sh bash zsh yml yaml toml r pl pm ps1 tf cfg conf cmake Dockerfile Makefile",
+    ("-- ", ""): "sql lua hs elm",
+    ("<!-- ", " -->"): "md markdown html htm",
+    ("/* ", " */"): "css scss less",
+}.items() for name in names.split()}
+
+def comment_syntax(path):
+    """Comment (prefix, suffix) for a file path, or None for file types that cannot be annotated safely."""
+    name = path.rsplit('/', 1)[-1]
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else name
+    return COMMENT_SYNTAX.get(extension)
+
+def format_review_comment(item, syntax=("// ", "")):
+    prefix, suffix = syntax
+
+    def comment(text):
+        # Keep block-style comments (<!-- -->, /* */) from being closed early
+        return f"{prefix}{text.replace(suffix.strip(), ' ') if suffix else text}{suffix}"
+
+    lines = [comment(f"CODE REVIEW: {item.get('feedback') or item.get('issue', '')}")]
+    recommendation = item.get('recommendation', '')
+    if recommendation:
+        lines.append(comment(f"RECOMMENDATION: {recommendation}"))
+
+    code_suggestion = item.get('code_suggestion', '')
+    if code_suggestion:
+        # Format the code suggestion as a comment
+        lines.append(comment("SUGGESTED CODE:"))
+        lines.extend(comment(code_line) for code_line in code_suggestion.strip().split('\n'))
+    return "\n".join(lines)
+
+def add_comments_to_code(file_content, feedback_items, index=None, path=None):
+    """
+    Add review comments to code file based on feedback items.
+    Returns the updated file content with comments inserted.
+    Each comment goes before the line its line_number resolves to (see
+    FileIndex.resolve); the file is rebuilt in a single pass over the sorted
+    insertion points using the index's line offsets. With path, comments use that
+    file type's syntax (see comment_syntax) and files that cannot be annotated safely
+    are returned unchanged; without it, // comments are used.
+    """
+    syntax = comment_syntax(path) if path is not None else ("// ", "")
+    if not feedback_items or not file_content or syntax is None:
+        return file_content
+    index = index or FileIndex(file_content)
+
+    insertions = []
+    for position, item in enumerate(feedback_items):
+        line_num = index.resolve(item.get('line_number', ''))
+        if line_num is not None:
+            insertions.append((min(line_num, index.line_count + 1), position, format_review_comment(item, syntax)))
+    insertions.sort()
+
+    parts, previous = [], 0
+    for line_num, _, comment_text in insertions:
+        if line_num > index.line_count:
+            # Past the end of the file: append after the last line
+            parts.append(file_content[previous:])
+            parts.append(f"\n{comment_text}")
+            previous = len(file_content)
+            continue
+        offset = index.offsets[line_num - 1]
+        parts.append(file_content[previous:offset])
+        parts.append(f"{comment_text}\n")
+        previous = offset
+    parts.append(file_content[previous:])
+    return ''.join(parts)
+
+class GitHubPublishError(Exception):
+    """Raised when a GitHub call made while publishing review comments fails."""
+
+def github_call(method, path, github_token, api_calls, **kwargs):
+    """One GitHub API request on the pooled session; counts it and returns the JSON body."""
+    response = get_http_session("github").request(method, f"{GITHUB_API_URL}{path}",
+                                                  headers=github_headers(github_token), **kwargs)
+    api_calls["count"] = api_calls.get("count", 0) + 1
+    if response.status_code >= 400:
+        try:
+            message = response.json().get('message', response.text)
+        except ValueError:
+            message = response.text
+        raise GitHubPublishError(f"{method} {path} failed ({response.status_code}): {message}")
+    return response.json() if response.content else {}
+
+def publish_review_commit(repo_url, base_branch, github_token, updated_files, new_branch, message, snapshot,
+                          pr_title=None, pr_body="", api_calls=None):
+    """
+    Commit all annotated files to a new branch in one commit through the Git Data API.
+    The commit is built on the fetched commit in snapshot (see get_github_files), not on
+    the branch's current head, so changes pushed since the fetch are never reverted.
+    Files are written with their fetched mode; files that are not regular files or were
+    not valid UTF-8 are skipped. Reads the fetched commit, creates one tree with every
+    file inlined, creates the commit and the branch ref and, when pr_title is given,
+    opens a pull request against base_branch. At most 6 API calls however many files or
+    findings there are.
+    Returns (result, error) where result has branch, commit_sha, pr_url, files, skipped
+    and api_calls.
+    """
+    api_calls = api_calls if api_calls is not None else {}
+    parsed = parse_github_repo_url(repo_url)
+    if not parsed:
+        return None, "Invalid GitHub repository URL format."
+    if not snapshot or not snapshot.get("commit_sha"):
+        return None, "The fetched commit is unknown; process the meeting again to refetch the repository."
+    modes = snapshot.get("modes") or {}
+    undecodable = set(snapshot.get("undecodable") or [])
+    skipped = sorted(path for path in updated_files
+                     if path in undecodable
+                     or modes.get(path, GIT_FILE_MODE) not in (GIT_FILE_MODE, GIT_EXECUTABLE_MODE))
+    entries = [{"path": path, "mode": modes.get(path, GIT_FILE_MODE), "type": "blob", "content": content}
+               for path, content in updated_files.items() if path not in skipped]
+    if not entries:
+        return None, "No annotated files to commit."
+    owner, repo = parsed
+    base = f"/repos/{owner}/{repo}"
+    base_sha = snapshot["commit_sha"]
+    try:
+        base_tree = github_call("GET", f"{base}/git/commits/{base_sha}", github_token, api_calls)['tree']['sha']
+        tree = github_call("POST", f"{base}/git/trees", github_token, api_calls, json={
+            "base_tree": base_tree, "tree": entries})
+        commit = github_call("POST", f"{base}/git/commits", github_token, api_calls, json={
+            "message": message, "tree": tree['sha'], "parents": [base_sha]})
+        github_call("POST", f"{base}/git/refs", github_token, api_calls,
+                    json={"ref": f"refs/heads/{new_branch}", "sha": commit['sha']})
+        pr_url = None
+        if pr_title:
+            if not base_branch:
+                base_branch = github_call("GET", base, github_token, api_calls)['default_branch']
+            pull = github_call("POST", f"{base}/pulls", github_token, api_calls, json={
+                "title": pr_title, "body": pr_body, "head": new_branch, "base": base_branch})
+            pr_url = pull.get('html_url')
+    except (GitHubPublishError, KeyError, requests.exceptions.RequestException) as e:
+        return None, f"GitHub API error: {e}"
+    return {"branch": new_branch, "commit_sha": commit['sha'], "pr_url": pr_url,
+            "files": len(entries), "skipped": skipped, "api_calls": api_calls["count"]}, None
+
+def format_review_markdown(item):
+    body = f"**Code review:** {item.get('feedback') or item.get('issue', '')}"
+    if item.get('recommendation'):
+        body += f"\n\n**Recommendation:** {item['recommendation']}"
+    if item.get('code_suggestion'):
+        body += f"\n\n```\n{item['code_suggestion'].strip()}\n```"
+    return body
+
+def publish_pull_request_review(repo_url, pr_number, github_token, feedback_by_file, file_index, snapshot, branch,
+                                summary="", api_calls=None):
+    """
+    Post every finding as one pull request review with inline comments. Line numbers
+    come from the files fetched for branch, so the review is refused unless the pull
+    request's head is that branch at the fetched commit in snapshot. Findings whose
+    line cannot be resolved go into the review body. If GitHub rejects the inline
+    comments (lines outside the PR diff), the review is re-posted once with all
+    findings in the body, so at most 3 API calls are made.
+    Returns (result, error) where result has review_url, inline, in_body and api_calls.
+    """
+    api_calls = api_calls if api_calls is not None else {}
+    parsed = parse_github_repo_url(repo_url)
+    if not parsed:
+        return None, "Invalid GitHub repository URL format."
+    if not snapshot or not snapshot.get("commit_sha"):
+        return None, "The fetched commit is unknown; process the meeting again to refetch the repository."
+    owner, repo = parsed
+    base = f"/repos/{owner}/{repo}/pulls/{pr_number}"
+
+    comments, general = [], []
+    for path, items in feedback_by_file.items():
+        for item in items:
+            line = file_index[path].resolve(item.get('line_number', '')) if path in file_index else None
+            if line is not None and line <= file_index[path].line_count:
+                comments.append({"path": path, "line": line, "side": "RIGHT", "body": format_review_markdown(item)})
+            else:
+                general.append(f"`{path}`: {format_review_markdown(item)}")
+
+    def review_body(extra):
+        return "\n\n".join(part for part in [summary, *extra] if part) or "Automated code review."
+
+    try:
+        head = github_call("GET", base, github_token, api_calls)['head']
+        if branch and head['ref'] != branch:
+            return None, (f"Pull request #{pr_number} is for branch '{head['ref']}' but the files were "
+                          f"fetched from '{branch}'.")
+        head_sha = head['sha']
+        if head_sha != snapshot["commit_sha"]:
+            return None, (f"Pull request #{pr_number} head is {head_sha[:7]} but the files were fetched at "
+                          f"{snapshot['commit_sha'][:7]}; process the meeting again to refetch the repository.")
+        try:
+            review = github_call("POST", f"{base}/reviews", github_token, api_calls, json={
+                "commit_id": head_sha, "event": "COMMENT", "body": review_body(general), "comments": comments})
+            inline = len(comments)
+        except GitHubPublishError:
+            if not comments:
+                raise
+            located = [f"`{c['path']}` line {c['line']}: {c['body']}" for c in comments]
+            review = github_call("POST", f"{base}/reviews", github_token, api_calls, json={
+                "commit_id": head_sha, "event": "COMMENT", "body": review_body(located + general)})
+            inline = 0
+    except (GitHubPublishError, KeyError, requests.exceptions.RequestException) as e:
+        return None, f"GitHub API error: {e}"
+    return {"review_url": review.get('html_url'), "inline": inline,
+            "in_body": len(comments) + len(general) - inline, "api_calls": api_calls["count"]}, None
+
+# --------------------------------------------------------------------
+# Utility Functions
+# --------------------------------------------------------------------
+
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_BLOCK_SECONDS = 1.0
+AUDIO_PIPE_CHUNK_BYTES = 1024 * 1024
+SUPPORTED_MEDIA_EXTENSIONS = ['mp4', 'mp3', 'wav']
+
+class AudioDecodeError(Exception):
+    """Raised when ffmpeg cannot decode the uploaded media."""
+
+def get_ffmpeg_exe():
+    """Locate ffmpeg on PATH, falling back to the binary shipped with imageio-ffmpeg."""
+    exe = shutil.which("ffmpeg")
+    if exe:
+        return exe
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        raise AudioDecodeError("ffmpeg was not found. Install ffmpeg or imageio-ffmpeg.")
+
+def ffmpeg_pcm_blocks(source, sample_rate=AUDIO_SAMPLE_RATE, block_seconds=AUDIO_BLOCK_SECONDS):
+    """
+    Decode source with ffmpeg and yield mono 16-bit PCM blocks at sample_rate.
+    source is a file path (opened by ffmpeg directly) or a binary file object, which is
+    piped to ffmpeg's stdin chunk by chunk from a feeder thread.
+    """
+    piped = not isinstance(source, str)
+    command = [get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error",
+               "-i", "pipe:0" if piped else source,
+               "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "pipe:1"]
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE if piped else subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stderr_chunks = []
+
+    def feed():
+        try:
+            while chunk := source.read(AUDIO_PIPE_CHUNK_BYTES):
+                proc.stdin.write(chunk)
+        except (BrokenPipeError, OSError, ValueError):
+            pass  # ffmpeg exited early; its stderr explains why
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    threads = [threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)]
+    if piped:
+        threads.append(threading.Thread(target=feed, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    block_bytes = int(sample_rate * block_seconds) * 2
+    try:
+        while block := proc.stdout.read(block_bytes):
+            yield block
+        proc.wait()
+        for thread in threads:
+            thread.join()
+        if proc.returncode != 0:
+            message = b"".join(stderr_chunks).decode('utf-8', errors='replace').strip()
+            raise AudioDecodeError(message or f"ffmpeg exited with status {proc.returncode}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+def stream_pcm_frames(source, file_extension, block_seconds=AUDIO_BLOCK_SECONDS):
+    """
+    Yield mono 16 kHz 16-bit PCM blocks decoded from a media file path or file object.
+    Some MP4s keep their index at the end of the file and cannot be decoded from a pipe;
+    those are spooled to a temporary file once and decoded from there.
+    """
+    produced = False
+    try:
+        for block in ffmpeg_pcm_blocks(source, block_seconds=block_seconds):
+            produced = True
+            yield block
+    except AudioDecodeError:
+        if produced or isinstance(source, str) or not source.seekable():
+            raise
+    # ffmpeg can also exit cleanly without output when the MP4 index is unreachable
+    if produced or isinstance(source, str) or not source.seekable():
+        return
+
+    source.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=f'.{file_extension}') as spooled:
+        shutil.copyfileobj(source, spooled, AUDIO_PIPE_CHUNK_BYTES)
+        spooled.flush()
+        yield from ffmpeg_pcm_blocks(spooled.name, block_seconds=block_seconds)
+
+def extract_audio(file, on_error=None):
+    """
+    Stream the audio track of an uploaded video/audio file as mono 16 kHz PCM blocks.
+    The upload is piped straight into ffmpeg, so no full copies are made in memory
+    or on disk and memory use does not grow with the length of the recording.
+    Errors go to on_error(message) (default: logged) and None is returned.
+    """
+    try:
+        file_extension = file.name.split('.')[-1].lower()
+        if file_extension not in SUPPORTED_MEDIA_EXTENSIONS:
+            raise ValueError("Unsupported file format. Use mp4, mp3, or wav.")
+        get_ffmpeg_exe()
+        file.seek(0)
+        return stream_pcm_frames(file, file_extension)
+    except Exception as e:
+        (on_error or logger.error)(f"Error extracting audio: {str(e)}")
+        return None
+
+STT_WORKERS = int(os.getenv("STT_WORKERS", "4"))
+STT_SEGMENT_MIN_SECONDS = float(os.getenv("STT_SEGMENT_MIN_SECONDS", "5"))
+STT_SEGMENT_MAX_SECONDS = float(os.getenv("STT_SEGMENT_MAX_SECONDS", "30"))
+STT_WINDOW_SECONDS = 0.1
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "google")
+TRANSCRIPTION_BACKENDS = {
+    "google": "Google Web Speech (online)",
+    "whisper": "Local Whisper (offline, CPU)",
+}
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "en")
+WHISPER_SAMPLE_RATE = 16000
+
+def find_silence_cut(samples, sample_rate, min_seconds, max_seconds):
+    """
+    Pick where to end the current segment: the first quiet window after min_seconds,
+    or the quietest window if the buffer has reached max_seconds. None means keep reading.
+    """
+    np = lazy_import("numpy")
+    window = int(sample_rate * STT_WINDOW_SECONDS)
+    min_n = int(sample_rate * min_seconds)
+    max_n = int(sample_rate * max_seconds)
+    if len(samples) < min_n + window:
+        return None
+
+    usable = samples[:max_n].astype(np.float64)
+    threshold = 0.2 * np.sqrt(np.mean(usable ** 2))
+    n_windows = (len(usable) - min_n) // window
+    rms = np.sqrt(np.mean(usable[min_n:min_n + n_windows * window].reshape(n_windows, window) ** 2, axis=1))
+    quiet = np.flatnonzero(rms <= threshold)
+    if len(quiet):
+        return min_n + int(quiet[0]) * window + window // 2
+    if len(samples) >= max_n:
+        return min_n + int(np.argmin(rms)) * window + window // 2
+    return None
+
+def split_on_silence(blocks, sample_rate, min_seconds=STT_SEGMENT_MIN_SECONDS, max_seconds=STT_SEGMENT_MAX_SECONDS):
+    """Split a stream of mono 16-bit PCM blocks at pauses. Yields (start_s, end_s, pcm_bytes)."""
+    np = lazy_import("numpy")
+    buffer = np.zeros(0, dtype=np.int16)
+    offset = 0
+    for block in blocks:
+        buffer = np.concatenate([buffer, np.frombuffer(block, dtype=np.int16)])
+        while (cut := find_silence_cut(buffer, sample_rate, min_seconds, max_seconds)) is not None:
+            yield offset / sample_rate, (offset + cut) / sample_rate, buffer[:cut].tobytes()
+            offset += cut
+            buffer = buffer[cut:]
+    if len(buffer):
+        yield offset / sample_rate, (offset + len(buffer)) / sample_rate, buffer.tobytes()
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def format_transcript(segments):
+    """Join transcribed segments into a timestamped transcript, skipping silent ones."""
+    return "\n".join(f"[{format_timestamp(s['start'])}] {s['text']}" for s in segments if s['text'])
+
+class TranscriptionError(Exception):
+    """Raised by a transcription backend when a segment could not be transcribed."""
+
+class TranscriptionBackend:
+    """
+    Speech-to-text engine used by transcribe_segments.
+    transcribe() receives one mono 16-bit PCM segment and returns its text ("" for silence).
+    max_workers is how many segments the backend can usefully transcribe at once.
+    """
+    name = "base"
+    max_workers = 1
+
+    def transcribe(self, pcm, sample_rate):
+        raise NotImplementedError
+
+class GoogleSpeechBackend(TranscriptionBackend):
+    """Google Web Speech API through speech_recognition (network, rate limited)."""
+    name = "google"
+    max_workers = STT_WORKERS
+
+    def __init__(self):
+        self.sr = lazy_import("speech_recognition")
+        self.recognizer = self.sr.Recognizer()
+
+    def transcribe(self, pcm, sample_rate):
+        sr = self.sr
+        try:
+            return self.recognizer.recognize_google(sr.AudioData(pcm, sample_rate, 2))
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            raise TranscriptionError(str(e))
+
+class WhisperBackend(TranscriptionBackend):
+    """Local CPU transcription with a faster-whisper model; no network access needed."""
+    name = "whisper"
+    max_workers = 1
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, pcm, sample_rate):
+        np = lazy_import("numpy")
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            target_length = int(len(audio) * WHISPER_SAMPLE_RATE / sample_rate)
+            audio = np.interp(np.linspace(0, len(audio), target_length, endpoint=False),
+                              np.arange(len(audio)), audio).astype(np.float32)
+        try:
+            segments, _ = self.model.transcribe(audio, beam_size=1, language=WHISPER_LANGUAGE or None)
+            return " ".join(segment.text.strip() for segment in segments).strip()
+        except Exception as e:
+            raise TranscriptionError(str(e))
+
+@lru_cache(maxsize=None)
+def load_whisper_model(model_size):
+    """Load the Whisper model once per process; it is reused across reruns and sessions."""
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError:
+        raise TranscriptionError("The local Whisper backend requires faster-whisper (pip install faster-whisper).")
+    return WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=os.cpu_count() or 4)
+
+def get_transcription_backend(name=None):
+    """Return the transcription backend registered under name (see TRANSCRIPTION_BACKENDS)."""
+    name = name or TRANSCRIPTION_BACKEND
+    if name == "whisper":
+        return WhisperBackend(load_whisper_model(WHISPER_MODEL_SIZE))
+    if name == "google":
+        return GoogleSpeechBackend()
+    raise TranscriptionError(f"Unknown transcription backend: {name}")
+
+def transcribe_segments(segments, sample_rate, on_segment=None, backend=None):
+    """
+    Transcribe audio segments concurrently and return them in order as
+    [{"start", "end", "text", "error"}]. At most 2 * backend.max_workers segments are
+    held in memory at once. on_segment(finished_segments) is called from the calling
+    thread every time a segment completes, with the finished segments in order.
+    """
+    backend = backend or get_transcription_backend()
+    workers = backend.max_workers
+
+    def recognize(pcm):
+        with get_telemetry().span("stt.segment", backend=backend.name, audio_seconds=len(pcm) / 2 / sample_rate) as span:
+            try:
+                return backend.transcribe(pcm, sample_rate), None
+            except TranscriptionError as e:
+                span["status"] = "error"
+                get_telemetry().inc("stt_segment_errors_total", backend=backend.name)
+                return "", str(e)
+
+    results = {}
+
+    def collect(futures):
+        for future in futures:
+            index, start, end = pending.pop(future)
+            text, error = future.result()
+            results[index] = {"start": start, "end": end, "text": text, "error": error}
+        if on_segment:
+            on_segment([results[i] for i in sorted(results)])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for index, (start, end, pcm) in enumerate(segments):
+            pending[submit_in_context(executor, recognize, pcm)] = (index, start, end)
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    return [results[i] for i in sorted(results)]
+
+def benchmark_transcription_backend(backend, audio_blocks, sample_rate=AUDIO_SAMPLE_RATE):
+    """
+    Run the segmenting/transcription pipeline over a PCM block stream (see extract_audio)
+    with the given backend and report its throughput as audio seconds transcribed per
+    wall-clock second. Decoding is streamed alongside, so it is included in the timing.
+    """
+    started = time.perf_counter()
+    segments = transcribe_segments(split_on_silence(audio_blocks, sample_rate), sample_rate, backend=backend)
+    wall_seconds = time.perf_counter() - started
+    audio_seconds = segments[-1]["end"] if segments else 0.0
+    return {
+        "backend": backend.name,
+        "audio_seconds": round(audio_seconds, 2),
+        "wall_seconds": round(wall_seconds, 2),
+        "realtime_factor": round(audio_seconds / wall_seconds, 2) if wall_seconds else 0.0,
+        "segments": len(segments),
+        "failed_segments": sum(1 for s in segments if s["error"]),
+    }
+
+def speech_to_text(audio_blocks, on_partial=None, backend=None, sample_rate=AUDIO_SAMPLE_RATE, on_error=None):
+    """
+    Convert a stream of mono 16-bit PCM blocks (see extract_audio) to text.
+    The audio is split at pauses and the segments are transcribed in parallel;
+    on_partial(text) receives the transcript so far as segments finish.
+    """
+    if audio_blocks is None:
+        return ""
+    on_segment = (lambda done: on_partial(format_transcript(done))) if on_partial else None
+    try:
+        segments = transcribe_segments(split_on_silence(audio_blocks, sample_rate), sample_rate, on_segment, backend)
+    except AudioDecodeError as e:
+        (on_error or logger.error)(f"Error extracting audio: {e}")
+        return ""
+    errors = [s['error'] for s in segments if s['error']]
+    if errors:
+        (on_error or logger.error)(f"Speech recognition error on {len(errors)} of {len(segments)} segments: {errors[0]}")
+    text = format_transcript(segments)
+    if not text and not errors:
+        return "[inaudible]"
+    return text
+
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+GROQ_CONTEXT_TOKENS = int(os.getenv("GROQ_CONTEXT_TOKENS", "8192"))
+# Ask for response_format=json_object on non-streaming analysis calls; turned off for
+# the process if the model rejects it
+GROQ_JSON_MODE = os.getenv("GROQ_JSON_MODE", "1") == "1"
+ANALYSIS_MAX_TOKENS = 2500
+ANALYSIS_FILE_LIST_TOKENS = int(os.getenv("ANALYSIS_FILE_LIST_TOKENS", "400"))
+ANALYSIS_CONTEXT_TOKENS = int(os.getenv("ANALYSIS_CONTEXT_TOKENS", "1500"))
+ANALYSIS_SNIPPET_LINES = 30
+ANALYSIS_SNIPPETS_PER_FILE = 2
+ANALYSIS_CHUNK_TOKENS = int(os.getenv("ANALYSIS_CHUNK_TOKENS", "3500"))
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "4"))
+CHARS_PER_TOKEN = 4
+CHUNK_BOUNDARY_MODULUS = 16
+
+ANALYSIS_PROMPT = """
+Analyze this code review meeting transcript{part}:
+{text}
+
+Relevant repository code (path:lines, each line prefixed with its number):
+{repo_context}
+
+Other GitHub files: {file_list}
+
+Provide:
+1. A summary
+2. Action items (task, assignee)
+3. Code feedback (file, feedback, line_number, recommendation, code_suggestion)
+4. Decisions
+
+Return JSON:
+{{
+    "summary": "...",
+    "action_items": [{{"task": "...", "assignee": "..."}}],
+    "code_feedback": [
+        {{
+            "file": "file_path",
+            "feedback": "...",
+            "line_number": "...",
+            "recommendation": "...",
+            "code_suggestion": "..."
+        }}
+    ],
+    "decisions": ["..."]
+}}
+"""
+
+SECTION_PROMPT = """
+Analyze this code review meeting transcript{part}:
+{text}
+
+Relevant repository code (path:lines, each line prefixed with its number):
+{repo_context}
+
+Other GitHub files: {file_list}
+
+Return JSON with only these keys:
+{{
+{sections}
+}}
+"""
+
+ANALYSIS_SECTION_FORMATS = {
+    "summary": '    "summary": "..."',
+    "action_items": '    "action_items": [{"task": "...", "assignee": "..."}]',
+    "code_feedback": '    "code_feedback": [{"file": "file_path", "feedback": "...", "line_number": "...", '
+                     '"recommendation": "...", "code_suggestion": "..."}]',
+    "decisions": '    "decisions": ["..."]',
+}
+
+# Fields of each list item, required ones first; items missing a required field are dropped
+ANALYSIS_SCHEMA = {
+    "action_items": (("task",), ("assignee",)),
+    "code_feedback": (("file", "feedback"), ("line_number", "recommendation", "code_suggestion")),
+}
+
+REDUCE_PROMPT = """
+These are summaries of consecutive parts of one code review meeting:
+{summaries}
+
+Combine them into a single concise summary of the whole meeting. Return only the summary text.
+"""
+
+def estimate_tokens(text):
+    """Rough token count for budgeting prompts (about 4 characters per token)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def split_transcript(text, max_tokens):
+    """
+    Split a transcript into chunks of at most max_tokens, breaking on line boundaries,
+    then on sentence boundaries for very long lines, then hard at the character limit.
+    Boundaries are content-defined: once a chunk is half full it ends after the first
+    line whose hash is a multiple of CHUNK_BOUNDARY_MODULUS, so editing or appending
+    text only changes the chunks around the change and the others keep their content.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for line in text.splitlines():
+        if len(line) <= max_chars:
+            pieces.append(line)
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', line):
+            pieces.extend(sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars))
+
+    content_defined = sum(len(piece) + 1 for piece in pieces) > max_chars
+    chunks, current, current_len = [], [], 0
+    for piece in pieces:
+        if current and current_len + len(piece) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current, current_len = [], 0
+        current.append(piece)
+        current_len += len(piece) + 1
+        if (content_defined and current_len >= max_chars // 2
+                and zlib.crc32(piece.encode()) % CHUNK_BOUNDARY_MODULUS == 0):
+            chunks.append("\n".join(current))
+            current, current_len = [], 0
+    if current:
+        chunks.append("\n".join(current))
+    return [chunk for chunk in chunks if chunk.strip()] or [text]
+
+def format_file_list(paths, max_tokens=ANALYSIS_FILE_LIST_TOKENS):
+    """List repository paths for the prompt, truncated to a token budget."""
+    if not paths:
+        return "No files provided."
+    lines, used = [], 0
+    for path in paths:
+        used += estimate_tokens(path) + 1
+        if used > max_tokens:
+            lines.append(f"... and {len(paths) - len(lines)} more files")
+            break
+        lines.append(path)
+    return "\n".join(lines)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+FILE_MENTION_BOOST = 5.0
+SYMBOL_MENTION_BOOST = 3.0
+
+def identifier_terms(text):
+    """Lowercased identifiers plus their snake_case/camelCase parts, e.g. getUserName -> get, user, name."""
+    stop_words = lazy_import("sklearn.feature_extraction.text").ENGLISH_STOP_WORDS
+    terms = []
+    for word in re.findall(r'[A-Za-z_][A-Za-z0-9_]+', text):
+        lower = word.lower()
+        if lower in stop_words:
+            continue
+        terms.append(lower)
+        parts = [p.lower() for p in re.findall(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+', word) if len(p) > 1]
+        if len(parts) > 1:
+            terms.extend(p for p in parts if p not in stop_words)
+    return terms
+
+def rank_repo_snippets(transcript, files_dict, snippet_lines=ANALYSIS_SNIPPET_LINES):
+    """
+    Score fixed-size code windows against the transcript with BM25, plus a boost for
+    windows of files named in the meeting and for windows defining a mentioned symbol.
+    Returns (snippets sorted by score, file paths sorted by their best snippet score).
+    Only transcript terms are counted in the code, so cost stays linear in repo size.
+    """
+    if not files_dict:
+        return [], []
+    query_terms = set(identifier_terms(transcript))
+    if not query_terms:
+        return [], list(files_dict)
+    lowered = transcript.lower()
+
+    windows = []
+    for path, content in files_dict.items():
+        lines = content.split('\n')
+        name = path.rsplit('/', 1)[-1].lower()
+        stem = name.rsplit('.', 1)[0]
+        mention = FILE_MENTION_BOOST if name in lowered else 0.0
+        if not mention and len(stem) >= 4 and stem in query_terms:
+            mention = FILE_MENTION_BOOST / 2
+        for start in range(0, len(lines), snippet_lines):
+            text = "\n".join(lines[start:start + snippet_lines])
+            if text.strip():
+                symbols = {s.lower() for s in SYMBOL_PATTERN.findall(text)}
+                boost = mention + SYMBOL_MENTION_BOOST * len(symbols & query_terms)
+                windows.append({"path": path, "start": start, "lines": lines[start:start + snippet_lines],
+                                "text": text, "boost": boost})
+    if not windows:
+        return [], list(files_dict)
+
+    np = lazy_import("numpy")
+    vectorizer = lazy_import("sklearn.feature_extraction.text").CountVectorizer(analyzer=identifier_terms, vocabulary=sorted(query_terms))
+    counts = vectorizer.transform(w["text"] for w in windows).tocsr()
+    doc_lengths = np.array([max(1, len(w["text"].split())) for w in windows], dtype=float)
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((len(windows) - document_frequency + 0.5) / (document_frequency + 0.5) + 1.0)
+    coo = counts.tocoo()
+    tf = coo.data.astype(float)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[coo.row] / doc_lengths.mean())
+    scores = np.bincount(coo.row, weights=idf[coo.col] * tf * (BM25_K1 + 1) / (tf + norm), minlength=len(windows))
+
+    for window, score in zip(windows, scores):
+        window["score"] = float(score) + window["boost"]
+    ranked = sorted((w for w in windows if w["score"] > 0), key=lambda w: -w["score"])
+    best = {}
+    for window in ranked:
+        best.setdefault(window["path"], window["score"])
+    paths = sorted(files_dict, key=lambda p: -best.get(p, 0.0))
+    return ranked, paths
+
+def select_repo_context(transcript, files_dict, max_tokens=ANALYSIS_CONTEXT_TOKENS,
+                        file_list_tokens=ANALYSIS_FILE_LIST_TOKENS):
+    """
+    Pack the repository code most relevant to the transcript into a fixed token budget.
+    Returns (repo_context, file_list): numbered snippets in rank order (at most
+    ANALYSIS_SNIPPETS_PER_FILE per file), and the remaining paths, most relevant first,
+    truncated to file_list_tokens. Prompt size stays bounded however large the repo is.
+    """
+    if not files_dict:
+        return "None provided.", "No files provided."
+    ranked, paths = rank_repo_snippets(transcript, files_dict)
+    selected, used, per_file = [], 0, {}
+    for window in ranked:
+        if per_file.get(window["path"], 0) >= ANALYSIS_SNIPPETS_PER_FILE:
+            continue
+        end = window["start"] + len(window["lines"])
+        header = f"{window['path']}:{window['start'] + 1}-{end}"
+        body = "\n".join(f"{window['start'] + i + 1}: {line}" for i, line in enumerate(window["lines"]))
+        cost = estimate_tokens(header) + estimate_tokens(body) + 2
+        if used + cost > max_tokens:
+            continue
+        selected.append(f"{header}\n{body}")
+        per_file[window["path"]] = per_file.get(window["path"], 0) + 1
+        used += cost
+    others = [path for path in paths if path not in per_file]
+    file_list = format_file_list(others, file_list_tokens) if others else "None."
+    return "\n\n".join(selected) or "None found.", file_list
+
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "64"))
+
+class LLMResponseCache:
+    """
+    Two-tier cache of chat completions keyed on a hash of model, messages and parameters.
+    An in-memory LRU tier sits in front of a SQLite tier; SQLite entries expire after
+    ttl_seconds and the least recently used ones are evicted above max_bytes.
+    """
+
+    def __init__(self, db_path, memory_entries, ttl_seconds, max_bytes):
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY, content TEXT, usage TEXT, size INTEGER, created REAL, accessed REAL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(**params):
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                get_telemetry().inc("cache_lookups_total", cache="llm", result="memory_hit")
+                return self._memory[key]
+            now = time.time()
+            row = self._db.execute("SELECT content, usage FROM llm_cache WHERE key = ? AND created > ?",
+                                   (key, now - self.ttl_seconds)).fetchone()
+            if row is None:
+                self.misses += 1
+                get_telemetry().inc("cache_lookups_total", cache="llm", result="miss")
+                return None
+            self._db.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            entry = (row[0], json.loads(row[1]))
+            self._remember(key, entry)
+            self.disk_hits += 1
+            get_telemetry().inc("cache_lookups_total", cache="llm", result="disk_hit")
+            return entry
+
+    def put(self, key, content, usage):
+        with self._lock:
+            self._remember(key, (content, usage))
+            now = time.time()
+            self._db.execute("INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, content, json.dumps(usage), len(content.encode()), now, now))
+            self._evict(now)
+            self._db.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM llm_cache WHERE created <= ?", (now - self.ttl_seconds,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM llm_cache ORDER BY accessed").fetchall():
+            self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM llm_cache")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_mb": round(size / (1024 * 1024), 2),
+        }
+
+@lru_cache(maxsize=None)
+def get_llm_cache():
+    """Process-wide LLM response cache, shared across sessions and reruns."""
+    return LLMResponseCache(os.path.join(APP_CACHE_DIR, "llm_cache.sqlite3"), LLM_CACHE_MEMORY_ENTRIES,
+                            LLM_CACHE_TTL_HOURS * 3600, LLM_CACHE_MAX_MB * 1024 * 1024)
+
+LLM_LATENCY_LOG_SIZE = 200
+
+@lru_cache(maxsize=None)
+def get_llm_latency_log():
+    """Recent LLM calls with time-to-first-token and total latency, newest last."""
+    return deque(maxlen=LLM_LATENCY_LOG_SIZE)
+
+def record_llm_call(label, started, first_token_at, cached, streamed, usage=None):
+    """Log one LLM call's latency and record it as an llm.<label> span with call and token counters."""
+    finished = time.perf_counter()
+    telemetry = get_telemetry()
+    telemetry.record_span(f"llm.{label}", started, model=GROQ_MODEL, cached=cached, streamed=streamed,
+                          ttft_ms=round(1000 * (first_token_at - started), 1) if first_token_at else None,
+                          prompt_tokens=(usage or {}).get("prompt_tokens"),
+                          completion_tokens=(usage or {}).get("completion_tokens"))
+    telemetry.inc("llm_calls_total", call=label, cached=cached)
+    if usage:
+        telemetry.inc("llm_tokens_total", usage["prompt_tokens"], call=label, direction="in")
+        telemetry.inc("llm_tokens_total", usage["completion_tokens"], call=label, direction="out")
+    get_llm_latency_log().append({
+        "call": label,
+        "ttft_ms": round(1000 * ((first_token_at or finished) - started), 1),
+        "total_ms": round(1000 * (finished - started), 1),
+        "cached": cached,
+        "streamed": streamed,
+    })
+
+json_mode_rejected = threading.Event()
+
+def chat_params(prompt, max_tokens, temperature, json_mode=False):
+    params = {
+        "model": GROQ_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+    }
+    if json_mode and GROQ_JSON_MODE and not json_mode_rejected.is_set():
+        params["response_format"] = {"type": "json_object"}
+    return params
+
+def failed_json_generation(error):
+    """The rejected text of a JSON-mode call that failed validation (Groq's json_validate_failed), else None."""
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        body = body.get("error", body)
+        if isinstance(body, dict) and body.get("code") == "json_validate_failed":
+            return body.get("failed_generation") or ""
+    return None
+
+def create_chat_completion(client, params):
+    """
+    client.chat.completions.create with JSON-mode fallbacks. Returns (content, usage or None,
+    rejected). If the model rejects response_format the call is repeated without it (and JSON
+    mode stays off for the process); if the answer failed JSON validation, its text is returned
+    with rejected=True so the caller can repair it rather than losing the whole response.
+    """
+    try:
+        response = client.chat.completions.create(**params)
+    except Exception as e:
+        if "response_format" not in params:
+            raise
+        failed_generation = failed_json_generation(e)
+        if failed_generation is not None:
+            return failed_generation, None, True
+        if getattr(e, "status_code", None) != 400 or "response_format" not in str(e):
+            raise
+        logger.warning("Model %s rejected JSON mode; continuing without it", params["model"])
+        json_mode_rejected.set()
+        params = {k: v for k, v in params.items() if k != "response_format"}
+        response = client.chat.completions.create(**params)
+    content = response.choices[0].message.content
+    if not response.usage:
+        return content, None, False
+    return content, {"prompt_tokens": response.usage.prompt_tokens,
+                     "completion_tokens": response.usage.completion_tokens}, False
+
+def groq_chat_completion(client, prompt, max_tokens, temperature=0.5, cache=None, label="completion",
+                         json_mode=False, validate=None):
+    """
+    Run one chat completion and return (content, {"prompt_tokens", "completion_tokens", "cached"}).
+    With an LLMResponseCache, identical requests are answered from the cache at no token cost.
+    json_mode requests a JSON object answer where the model supports it (see GROQ_JSON_MODE).
+    With validate(content) -> bool, answers that fail it (and JSON-mode rejections) are
+    neither cached nor served from the cache, so a broken answer is not replayed.
+    """
+    params = chat_params(prompt, max_tokens, temperature, json_mode)
+    started = time.perf_counter()
+    key = LLMResponseCache.make_key(**params) if cache else None
+    if cache:
+        cached = cache.get(key)
+        if cached is not None and (validate is None or validate(cached[0])):
+            record_llm_call(label, started, None, cached=True, streamed=False)
+            return cached[0], {"prompt_tokens": 0, "completion_tokens": 0, "cached": True}
+
+    content, usage, rejected = create_chat_completion(client, params)
+    if usage is None:
+        usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(content or "")}
+    if cache and content and not rejected and (validate is None or validate(content)):
+        cache.put(key, content, usage)
+    record_llm_call(label, started, None, cached=False, streamed=False, usage=usage)
+    return content, dict(usage, cached=False)
+
+def stream_chat_completion(client, prompt, max_tokens, temperature=0.5, cache=None, usage_out=None, label="completion",
+                           validate=None):
+    """
+    Stream one chat completion, yielding text deltas as they arrive.
+    A cached answer is yielded in one piece. Once the stream is exhausted, usage_out
+    (a dict) receives the same usage fields groq_chat_completion returns. validate is
+    applied to cached and finished answers as in groq_chat_completion. Streaming calls
+    never use JSON mode (Groq does not support it with stream=True).
+    """
+    params = chat_params(prompt, max_tokens, temperature)
+    started = time.perf_counter()
+    key = LLMResponseCache.make_key(**params) if cache else None
+    if cache:
+        cached = cache.get(key)
+        if cached is not None and (validate is None or validate(cached[0])):
+            record_llm_call(label, started, None, cached=True, streamed=True)
+            if usage_out is not None:
+                usage_out.update(prompt_tokens=0, completion_tokens=0, cached=True)
+            yield cached[0]
+            return
+
+    parts, first_token_at, usage = [], None, None
+    for chunk in client.chat.completions.create(stream=True, **params):
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            parts.append(delta)
+            yield delta
+        # Groq reports token usage on the final chunk
+        chunk_usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+        if chunk_usage:
+            usage = {"prompt_tokens": chunk_usage.prompt_tokens, "completion_tokens": chunk_usage.completion_tokens}
+
+    content = "".join(parts)
+    if usage is None:
+        usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(content)}
+    if cache and content and (validate is None or validate(content)):
+        cache.put(key, content, usage)
+    record_llm_call(label, started, first_token_at, cached=False, streamed=True, usage=usage)
+    if usage_out is not None:
+        usage_out.update(usage, cached=False)
+
+def record_token_usage(token_usage, stage, usage):
+    """Accumulate per-stage call, cache-hit and token counts into token_usage."""
+    if token_usage is None:
+        return
+    totals = token_usage.setdefault(stage, {"calls": 0, "cached_calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+    totals["calls"] += 1
+    totals["cached_calls"] += 1 if usage.get("cached") else 0
+    totals["prompt_tokens"] += usage["prompt_tokens"]
+    totals["completion_tokens"] += usage["completion_tokens"]
+
+def parse_analysis_json(raw_response):
+    """Parse the model's JSON answer, tolerating commentary around it. Returns None on failure."""
+    try:
+        return json.loads(raw_response)
+    except (json.JSONDecodeError, TypeError):
+        pass
+    # Try to extract JSON from text (in case model adds commentary)
+    json_start = raw_response.find('{')
+    json_end = raw_response.rfind('}') + 1
+    if json_start >= 0 and json_end > json_start:
+        try:
+            return json.loads(raw_response[json_start:json_end])
+        except json.JSONDecodeError:
+            pass
+    return None
+
+def parse_partial_json(text):
+    """
+    Best-effort parse of a JSON object that is still streaming in.
+    Open strings, arrays and objects are closed; if that is not valid JSON (e.g. the
+    text stops inside a key), the text is cut back to the latest point where closing
+    the open containers gives a valid document. Returns None if nothing parses yet.
+    """
+    start = text.find('{')
+    if start < 0:
+        return None
+    text = text[start:]
+    stack, safe_points = [], []
+    in_string = escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+                safe_points.append((i + 1, len(stack)))
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            safe_points.append((i + 1, len(stack)))
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+            safe_points.append((i + 1, len(stack)))
+            if not stack:
+                break
+        elif ch == ',':
+            safe_points.append((i, len(stack)))
+
+    closers = ''.join(reversed(stack))
+    # Drop a dangling escape backslash before closing an open string
+    open_text = text[:-1] if escape else text
+    candidates = [open_text + ('"' if in_string else '') + closers]
+    for end, depth in reversed(safe_points[-8:]):
+        candidates.append(text[:end] + ''.join(reversed(stack[:depth])))
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+def as_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+def validate_analysis(data):
+    """
+    Check a parsed analysis against the expected sections and ANALYSIS_SCHEMA.
+    Returns (analysis, missing): the sections that are usable, with items coerced to
+    the expected shape (bare strings become tasks, numbers become strings, malformed
+    items are dropped), and the names of sections that are absent or of the wrong type.
+    """
+    analysis, missing = {}, []
+    summary = data.get("summary")
+    if summary is not None and not isinstance(summary, (dict, list)):
+        analysis["summary"] = as_text(summary)
+    else:
+        missing.append("summary")
+    for section, (required, optional) in ANALYSIS_SCHEMA.items():
+        items = data.get(section)
+        if not isinstance(items, list):
+            missing.append(section)
+            continue
+        valid = []
+        for item in items:
+            if isinstance(item, str) and section == "action_items":
+                item = {"task": item}
+            if not isinstance(item, dict):
+                continue
+            item = {k: as_text(v) for k, v in item.items()}
+            if all(item.get(field, "").strip() for field in required):
+                valid.append({field: item.get(field, "") for field in required + optional})
+        analysis[section] = valid
+    decisions = data.get("decisions")
+    if isinstance(decisions, list):
+        analysis["decisions"] = [as_text(d) for d in decisions if d not in (None, "")]
+    else:
+        missing.append("decisions")
+    return analysis, missing
+
+def parse_structured_analysis(raw_response):
+    """
+    Parse and validate one analysis answer; returns (analysis, missing) as validate_analysis.
+    An answer cut off mid-way (e.g. at max_tokens) is repaired locally by closing it at
+    its last complete value: the sections before the cut are kept and the one it stopped
+    in is reported missing, so only that part needs asking for again.
+    """
+    data = parse_analysis_json(raw_response)
+    truncated_section = None
+    if not isinstance(data, dict):
+        data = parse_partial_json(raw_response or "")
+        if isinstance(data, dict) and data:
+            last = list(data)[-1]
+            # The last parsed section is complete if the answer went on to a later one
+            tail = raw_response[raw_response.rfind(f'"{last}"') + len(last) + 2:]
+            if not any(f'"{section}"' in tail for section in ANALYSIS_SECTION_FORMATS):
+                truncated_section = last
+    if not isinstance(data, dict):
+        return {}, list(ANALYSIS_SECTION_FORMATS)
+    analysis, missing = validate_analysis(data)
+    if truncated_section in ANALYSIS_SECTION_FORMATS and truncated_section not in missing:
+        analysis.pop(truncated_section)
+        missing.append(truncated_section)
+    return analysis, missing
+
+def is_complete_analysis(raw_response):
+    """True if every analysis section parses and validates; only such answers are cached."""
+    return not parse_structured_analysis(raw_response)[1]
+
+def normalize_key(value):
+    return re.sub(r'\s+', ' ', str(value or '')).strip().lower()
+
+def repository_signature(files_dict):
+    """Hash of every path and file content, so memoized analyses are tied to the code they saw."""
+    digest = hashlib.sha256()
+    for path in sorted(files_dict or {}):
+        digest.update(path.encode() + b"\0" + files_dict[path].encode(errors='replace') + b"\0")
+    return digest.hexdigest()
+
+def segment_key(segment, repo_signature):
+    """Memo key of one transcript segment's analysis: its text, the repository, model and prompt."""
+    return hashlib.sha256(json.dumps([GROQ_MODEL, ANALYSIS_PROMPT, repo_signature, segment]).encode()).hexdigest()
+
+def merge_analyses(results):
+    """Merge per-chunk analyses, dropping duplicate action items, feedback and decisions."""
+    merged = {"summary": "", "action_items": [], "code_feedback": [], "decisions": []}
+    seen = set()
+    for result in results:
+        for item in result.get('action_items') or []:
+            if isinstance(item, dict):
+                key = ('action', normalize_key(item.get('task')), normalize_key(item.get('assignee')))
+                if key not in seen:
+                    seen.add(key)
+                    merged['action_items'].append(item)
+        for item in result.get('code_feedback') or []:
+            if isinstance(item, dict):
+                key = ('feedback', normalize_key(item.get('file')), normalize_key(item.get('feedback')),
+                       normalize_key(item.get('line_number')))
+                if key not in seen:
+                    seen.add(key)
+                    merged['code_feedback'].append(item)
+        for decision in result.get('decisions') or []:
+            key = ('decision', normalize_key(decision))
+            if key not in seen:
+                seen.add(key)
+                merged['decisions'].append(decision)
+    return merged
+
+def reduce_summaries(client, summaries, token_usage=None, cache=None):
+    """Combine partial summaries into one, in rounds that each fit the context window."""
+    summaries = [s for s in summaries if s and s.strip()]
+    budget = GROQ_CONTEXT_TOKENS - ANALYSIS_MAX_TOKENS - estimate_tokens(REDUCE_PROMPT)
+    while len(summaries) > 1:
+        groups, current = [], []
+        for summary in summaries:
+            if current and estimate_tokens("\n\n".join(current + [summary])) > budget:
+                groups.append(current)
+                current = []
+            current.append(summary)
+        groups.append(current)
+        if len(groups) == len(summaries):
+            # Every summary already fills the budget on its own; merging cannot shrink further
+            return "\n\n".join(summaries)
+        reduced = []
+        for group in groups:
+            if len(group) == 1:
+                reduced.append(group[0])
+                continue
+            content, usage = groq_chat_completion(
+                client, REDUCE_PROMPT.format(summaries="\n\n".join(group)), ANALYSIS_MAX_TOKENS, temperature=0.3,
+                cache=cache, label="analysis.reduce")
+            record_token_usage(token_usage, "reduce", usage)
+            reduced.append(content.strip())
+        summaries = reduced
+    return summaries[0] if summaries else ""
+
+ANALYSIS_PREVIEW_INTERVAL = 0.25
+
+def analyze_with_groq(text, files_dict=None, token_usage=None, concurrency=ANALYSIS_CONCURRENCY, cache=None,
+                      on_partial=None, on_error=None, segment_memo=None):
+    """
+    Analyze text using Groq API.
+    Transcripts larger than ANALYSIS_CHUNK_TOKENS (or the model context) are split into
+    chunks that are analyzed concurrently (map), then action items, feedback and
+    decisions are merged and deduplicated and the partial summaries combined (reduce).
+    Per-stage token counts are accumulated into token_usage when a dict is passed.
+    Repository code is ranked against the transcript and only the most relevant snippets
+    are sent (see select_repo_context), so prompt size is bounded for any repo size.
+    Completions are looked up in / stored to cache (an LLMResponseCache) when given.
+    on_partial(data) is called from the calling thread with the analysis so far: while
+    a single-chunk response streams in, and after each chunk of a long transcript.
+    Errors are reported through on_error(message) (default: logged).
+    Each answer is validated section by section (see parse_structured_analysis); sections
+    that are missing, malformed or cut off are asked for again on their own, so a bad
+    response never costs a full re-run of the chunk. Incomplete answers are not cached.
+    JSON mode applies to non-streaming calls only: the single-chunk streamed answer is
+    free-form and relies on this validation and the (JSON-mode) section re-request.
+    With segment_memo ({segment_key: analysis}, e.g. from the previous run on this
+    meeting), chunks already analyzed against the same repository are reused rather
+    than sent again; afterwards it holds exactly the current chunks' analyses. Chunk
+    boundaries are content-defined (see split_transcript), so an edit costs time in
+    proportion to the text it touches, plus the reduce step.
+    """
+    report_error = on_error or logger.error
+    client = get_groq_client()
+    repo_context, file_list = select_repo_context(text, files_dict)
+    prompt_overhead = estimate_tokens(ANALYSIS_PROMPT) + estimate_tokens(repo_context) + estimate_tokens(file_list) + 20
+    chunk_tokens = max(500, min(ANALYSIS_CHUNK_TOKENS, GROQ_CONTEXT_TOKENS - ANALYSIS_MAX_TOKENS - prompt_overhead))
+    chunks = split_transcript(text, chunk_tokens)
+
+    def part_label(index):
+        return f" (part {index + 1} of {len(chunks)})" if len(chunks) > 1 else ""
+
+    def chunk_prompt(index):
+        return ANALYSIS_PROMPT.format(part=part_label(index), text=chunks[index], repo_context=repo_context, file_list=file_list)
+
+    def complete_chunk(index, raw_response, usage):
+        """Validate one chunk's answer and re-request only the sections it lacks."""
+        usages = [("map", usage)]
+        analysis, missing = parse_structured_analysis(raw_response)
+        if missing:
+            sections = ",\n".join(ANALYSIS_SECTION_FORMATS[s] for s in missing)
+            prompt = SECTION_PROMPT.format(part=part_label(index), text=chunks[index], repo_context=repo_context,
+                                           file_list=file_list, sections=sections)
+            try:
+                content, repair_usage = groq_chat_completion(
+                    client, prompt, ANALYSIS_MAX_TOKENS, cache=cache, label="analysis.sections", json_mode=True,
+                    validate=lambda answer: not set(missing) & set(parse_structured_analysis(answer)[1]))
+                usages.append(("sections", repair_usage))
+                repaired, _ = parse_structured_analysis(content)
+                analysis.update({s: repaired[s] for s in missing if s in repaired})
+            except Exception as e:
+                logger.warning("Re-requesting sections %s failed: %s", missing, e)
+            outcome = "rerequested" if all(s in analysis for s in missing) else "failed"
+        else:
+            outcome = "valid"
+        get_telemetry().inc("analysis_structured_output_total", result=outcome)
+        if not analysis:
+            # Nothing usable; keep the raw answer so the user at least sees it
+            analysis = {"summary": raw_response or ""}
+        return analysis, usages, [s for s in missing if s not in analysis]
+
+    def analyze_chunk(index):
+        return complete_chunk(index, *groq_chat_completion(client, chunk_prompt(index), ANALYSIS_MAX_TOKENS,
+                                                           cache=cache, label="analysis.map", json_mode=True,
+                                                           validate=is_complete_analysis))
+
+    def stream_chunk(index):
+        usage, content, last_preview = {}, "", 0.0
+        for delta in stream_chat_completion(client, chunk_prompt(index), ANALYSIS_MAX_TOKENS, cache=cache,
+                                            usage_out=usage, label="analysis.map", validate=is_complete_analysis):
+            content += delta
+            if time.perf_counter() - last_preview >= ANALYSIS_PREVIEW_INTERVAL:
+                last_preview = time.perf_counter()
+                partial = parse_partial_json(content)
+                if isinstance(partial, dict):
+                    on_partial(partial)
+        return content, usage
+
+    results = [None] * len(chunks)
+    api_errors, parse_failures = [], []
+    keys = []
+    if segment_memo is not None:
+        repo_signature = repository_signature(files_dict)
+        keys = [segment_key(chunk, repo_signature) for chunk in chunks]
+    todo = []
+    for index in range(len(chunks)):
+        if keys and keys[index] in segment_memo:
+            results[index] = segment_memo[keys[index]]
+            record_token_usage(token_usage, "map", {"prompt_tokens": 0, "completion_tokens": 0, "cached": True})
+        else:
+            todo.append(index)
+    get_telemetry().inc("analysis_segments_total", len(chunks) - len(todo), result="reused")
+    get_telemetry().inc("analysis_segments_total", len(todo), result="analyzed")
+
+    def store(index, analysis, usages, missing):
+        for stage, usage in usages:
+            record_token_usage(token_usage, stage, usage)
+        if missing:
+            parse_failures.append((index, missing))
+        results[index] = analysis
+
+    if todo == [0] and len(chunks) == 1 and on_partial:
+        try:
+            store(0, *complete_chunk(0, *stream_chunk(0)))
+        except Exception as e:
+            api_errors.append(str(e))
+    elif todo:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = {submit_in_context(executor, analyze_chunk, i): i for i in todo}
+            for future in as_completed(futures):
+                try:
+                    store(futures[future], *future.result())
+                except Exception as e:
+                    api_errors.append(str(e))
+                    continue
+                if on_partial:
+                    done = [r for r in results if r is not None]
+                    on_partial(dict(merge_analyses(done), summary="\n\n".join(
+                        str(r['summary']) for r in done if r.get('summary'))))
+
+    if segment_memo is not None:
+        segment_memo.clear()
+        failed = {index for index, _ in parse_failures}
+        segment_memo.update({keys[i]: r for i, r in enumerate(results) if r is not None and i not in failed})
+    results = [r for r in results if r is not None]
+    if api_errors:
+        report_error(f"Groq API error: {api_errors[0]}")
+        if not results:
+            return {"summary": "Analysis failed.", "action_items": [], "code_feedback": [], "decisions": []}
+    if parse_failures:
+        sections = sorted({s for _, missing in parse_failures for s in missing})
+        report_error(f"Failed to parse Groq response ({', '.join(sections)} missing in "
+                     f"{len(parse_failures)} of {len(chunks)} parts).")
+
+    merged = merge_analyses(results)
+    try:
+        merged["summary"] = reduce_summaries(client, [r.get('summary', '') for r in results], token_usage, cache)
+    except Exception as e:
+        report_error(f"Groq API error: {e}")
+        merged["summary"] = "\n\n".join(r.get('summary', '') for r in results if r.get('summary'))
+    return merged
+
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "6"))
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "2500"))
+RAG_SUMMARY_TOKENS = 600
+RAG_TRANSCRIPT_CHUNK_TOKENS = 200
+RAG_CODE_CHUNK_LINES = 40
+
+def build_chat_index(transcript, files_dict=None):
+    """
+    Build a TF-IDF vector index over transcript passages and repository code windows.
+    Built once per meeting; returns None when there is nothing to index.
+    """
+    chunks = []
+    for passage in split_transcript(transcript or "", RAG_TRANSCRIPT_CHUNK_TOKENS):
+        if passage.strip():
+            timestamp = re.match(r'\[(\d{2}:\d{2}:\d{2})\]', passage)
+            label = f"Transcript {timestamp.group(1)}" if timestamp else "Transcript"
+            chunks.append({"source": label, "text": passage})
+    for path, content in (files_dict or {}).items():
+        lines = content.split('\n')
+        for start in range(0, len(lines), RAG_CODE_CHUNK_LINES):
+            window = "\n".join(lines[start:start + RAG_CODE_CHUNK_LINES])
+            if window.strip():
+                end = min(start + RAG_CODE_CHUNK_LINES, len(lines))
+                chunks.append({"source": f"{path}:{start + 1}-{end}", "text": window})
+    if not chunks:
+        return None
+
+    # Index the source label too, so questions naming a file match its code
+    vectorizer = lazy_import("sklearn.feature_extraction.text").TfidfVectorizer(
+        sublinear_tf=True, token_pattern=r"(?u)\b\w\w+\b", ngram_range=(1, 2), max_features=200000)
+    try:
+        matrix = vectorizer.fit_transform(f"{c['source']}\n{c['text']}" for c in chunks)
+    except ValueError:
+        return None  # empty vocabulary
+    return {"chunks": chunks, "vectorizer": vectorizer, "matrix": matrix}
+
+def retrieve_chunks(index, query, top_k=RAG_TOP_K, max_tokens=RAG_CONTEXT_TOKENS):
+    """Return the top_k chunks most similar to query, trimmed to fit max_tokens."""
+    if not index:
+        return []
+    # TF-IDF rows are L2-normalised, so the dot product is the cosine similarity
+    scores = (index["matrix"] @ index["vectorizer"].transform([query]).T).toarray().ravel()
+    selected, used = [], 0
+    for i in lazy_import("numpy").argsort(-scores)[:top_k]:
+        if scores[i] <= 0:
+            break
+        chunk = index["chunks"][i]
+        cost = estimate_tokens(chunk["text"]) + estimate_tokens(chunk["source"]) + 4
+        if used + cost > max_tokens:
+            continue
+        selected.append(chunk)
+        used += cost
+    return selected
+
+def compact_summary_context(summary_data, max_tokens=RAG_SUMMARY_TOKENS):
+    """Summary, action items and decisions as compact JSON, capped at max_tokens."""
+    context = json.dumps({key: summary_data.get(key) for key in ("summary", "action_items", "decisions")},
+                         separators=(",", ":"))
+    return context[:max_tokens * CHARS_PER_TOKEN]
+
+def build_chat_prompt(query, summary_data, index=None):
+    excerpts = "\n\n".join(f"[{chunk['source']}]\n{chunk['text']}" for chunk in retrieve_chunks(index, query))
+    return f"""
+Based on this meeting summary:
+{compact_summary_context(summary_data)}
+
+Relevant excerpts from the meeting transcript and repository:
+{excerpts or "None found."}
+
+Answer this question: {query}
+Quote the transcript or code excerpts where it helps, citing them by their [source] label.
+"""
+
+def chatbot_response_stream(query, summary_data, cache=None, index=None, on_error=None):
+    """
+    Stream the chatbot answer as text deltas.
+    With a chat index (see build_chat_index), only the transcript passages and code
+    windows most relevant to the question are added, so prompt size stays bounded.
+    """
+    try:
+        yield from stream_chat_completion(get_groq_client(), build_chat_prompt(query, summary_data, index), 500,
+                                          cache=cache, label="chat")
+    except Exception as e:
+        (on_error or logger.error)(f"Chatbot error: {e}")
+        yield "Sorry, I couldn't process your request."
+
+def chatbot_response(query, summary_data, cache=None, index=None, on_error=None):
+    """Generate chatbot response using Groq and summary data."""
+    return "".join(chatbot_response_stream(query, summary_data, cache, index, on_error))
+
+# --------------------------------------------------------------------
+# Email Delivery
+# --------------------------------------------------------------------
+
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+EMAIL_TEMPLATE_DIR = os.getenv("EMAIL_TEMPLATE_DIR", "")
+EMAIL_SUBJECT = "Code Review Meeting Summary"
+
+# string.Template sources; a file <EMAIL_TEMPLATE_DIR>/<name>.html overrides the default
+EMAIL_TEMPLATES = {
+    "summary_email": """<h2>Meeting Summary</h2>
+<p>$summary</p>
+$action_items
+$decisions""",
+    "action_items": """<h3>$title</h3>
+<ul>
+$items
+</ul>
+$note""",
+    "action_item": "<li>$task (Assignee: $assignee)</li>",
+    "decisions": """<h3>Decisions</h3>
+<ul>
+$items
+</ul>""",
+    "decision": "<li>$decision</li>",
+}
+
+@lru_cache(maxsize=None)
+def get_email_template(name):
+    """Compiled string.Template for an email part, read once per process."""
+    if EMAIL_TEMPLATE_DIR:
+        path = os.path.join(EMAIL_TEMPLATE_DIR, f"{name}.html")
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return string.Template(f.read())
+    return string.Template(EMAIL_TEMPLATES[name])
+
+def render_email_parts(summary_data):
+    """The parts of a summary email shared by every recipient, rendered once per send."""
+    action_item = get_email_template("action_item")
+    decision = get_email_template("decision")
+    items = [item for item in summary_data.get('action_items') or [] if isinstance(item, dict)]
+    return {
+        "summary": html.escape(str(summary_data.get('summary') or 'No summary available')),
+        "items": items,
+        "item_html": [action_item.safe_substitute(task=html.escape(str(item.get('task', ''))),
+                                                  assignee=html.escape(str(item.get('assignee', ''))))
+                      for item in items],
+        "decisions": get_email_template("decisions").safe_substitute(items="\n".join(
+            decision.safe_substitute(decision=html.escape(str(d))) for d in summary_data.get('decisions') or []))
+            if summary_data.get('decisions') else "",
+        "assignees": {normalize_key(item.get('assignee')): str(item.get('assignee'))
+                      for item in items if normalize_key(item.get('assignee'))},
+    }
+
+def recipient_assignee(recipient, assignees):
+    """
+    The action-item assignee a recipient is: the display name of "Name <address>" or
+    else the address's local part (alice.smith@ -> alice smith) must equal an assignee's
+    full name once normalized. No partial or fuzzy matches, so a list address or a
+    stranger never receives someone else's filtered email.
+    """
+    name, address = parseaddr(recipient)
+    for candidate in (name, re.sub(r'[._+-]+', ' ', address.split('@')[0])):
+        assignee = assignees.get(normalize_key(candidate))
+        if assignee:
+            return assignee
+    return None
+
+def render_summary_email(parts, recipient):
+    """
+    HTML body for one recipient and the number of action items assigned to them.
+    Recipients who are an assignee get only their own action items; others get all.
+    """
+    assignee = recipient_assignee(recipient, parts["assignees"])
+    if assignee is None:
+        mine, title, note = parts["item_html"], "Action Items", ""
+    else:
+        mine = [rendered for item, rendered in zip(parts["items"], parts["item_html"])
+                if normalize_key(item.get('assignee')) == normalize_key(assignee)]
+        others = len(parts["items"]) - len(mine)
+        title = "Your Action Items"
+        note = f"<p>{others} more action item{'s' if others != 1 else ''} assigned to others.</p>" if others else ""
+    action_items = get_email_template("action_items").safe_substitute(
+        title=title, items="\n".join(mine) or "<li>None</li>", note=note)
+    body = get_email_template("summary_email").safe_substitute(
+        summary=parts["summary"], action_items=action_items, decisions=parts["decisions"])
+    return body, (len(mine) if assignee is not None else None)
+
+class SMTPConnectionPool:
+    """
+    Authenticated SMTP connections kept open between sends, one per server, port, login
+    and STARTTLS setting. A connection idle longer than idle_seconds is checked with
+    NOOP before reuse, and one the server has dropped is reopened once per message.
+    """
+
+    def __init__(self, idle_seconds=SMTP_IDLE_SECONDS, timeout=SMTP_TIMEOUT_SECONDS):
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _open(self, server, port, username, password, starttls):
+        with get_telemetry().span("smtp.connect", server=server, port=port):
+            smtp = smtplib.SMTP(server, port, timeout=self.timeout)
+            try:
+                if starttls:
+                    smtp.starttls()
+                if username and password:
+                    smtp.login(username, password)
+            except Exception:
+                smtp.close()
+                raise
+        get_telemetry().inc("smtp_connections_total")
+        return smtp
+
+    def _connection(self, entry, settings):
+        smtp = entry["smtp"]
+        if smtp is not None and time.monotonic() - entry["used"] > self.idle_seconds:
+            try:
+                if smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP failed")
+            except (smtplib.SMTPException, OSError):
+                self._discard(entry)
+                smtp = None
+        if smtp is None:
+            smtp = entry["smtp"] = self._open(*settings)
+        return smtp
+
+    @staticmethod
+    def _discard(entry):
+        if entry["smtp"] is not None:
+            try:
+                entry["smtp"].close()
+            except OSError:
+                pass
+        entry["smtp"] = None
+
+    def send(self, server, port, username, password, messages, starttls=SMTP_STARTTLS):
+        """
+        Send [(recipient, message)] over one pooled connection, in order. Returns a list of
+        error strings (None for success) aligned with messages; a failure to connect or log
+        in fails every message.
+        """
+        try:
+            port = int(port)
+            if not 0 < port < 65536:
+                raise ValueError
+        except (TypeError, ValueError):
+            return [f"Invalid SMTP port: {port!r}"] * len(messages)
+        if password is not None and not isinstance(password, str):
+            return ["Invalid SMTP password"] * len(messages)
+        settings = (server, port, username, password or "", starttls)
+        key = settings[:3] + (hashlib.sha256(settings[3].encode()).hexdigest(), starttls)
+        with self._lock:
+            entry = self._entries.setdefault(key, {"smtp": None, "used": 0.0, "lock": threading.Lock()})
+        errors = []
+        with entry["lock"]:
+            for recipient, message in messages:
+                error = None
+                for attempt in range(2):
+                    try:
+                        with get_telemetry().span("smtp.send"):
+                            self._connection(entry, settings).send_message(message, to_addrs=[recipient])
+                        error = None
+                        break
+                    except smtplib.SMTPServerDisconnected as e:
+                        self._discard(entry)
+                        error = f"Disconnected: {e}"
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                        error = str(e)
+                        break
+                    except (smtplib.SMTPException, OSError) as e:
+                        # Connection or login failed; the remaining messages cannot go out either
+                        self._discard(entry)
+                        error = str(e)
+                        errors += [error] * (len(messages) - len(errors))
+                        return errors
+                entry["used"] = time.monotonic()
+                get_telemetry().inc("emails_total", result="failed" if error else "sent")
+                errors.append(error)
+        return errors
+
+    def close(self):
+        with self._lock:
+            for entry in self._entries.values():
+                with entry["lock"]:
+                    if entry["smtp"] is not None:
+                        try:
+                            entry["smtp"].quit()
+                        except (smtplib.SMTPException, OSError):
+                            pass
+                    self._discard(entry)
+            self._entries.clear()
+
+@lru_cache(maxsize=None)
+def get_smtp_pool():
+    """Process-wide SMTP connection pool, shared across sessions and reruns."""
+    return SMTPConnectionPool()
+
+def send_summary_emails(smtp_server, smtp_port, sender_email, sender_password, recipients, summary_data,
+                        starttls=SMTP_STARTTLS, pool=None):
+    """
+    Email the meeting summary to each recipient separately over one pooled SMTP connection.
+    Recipients who are an action-item assignee (see recipient_assignee) get only their own
+    action items. Returns one {"recipient", "success", "error", "action_items"} per recipient;
+    action_items is the number assigned to them, or None if they are not an assignee.
+    """
+    parts = render_email_parts(summary_data)
+    messages, counts = [], []
+    for recipient in recipients:
+        body, count = render_summary_email(parts, recipient)
+        msg = MIMEMultipart()
+        msg['Subject'] = EMAIL_SUBJECT
+        msg['From'] = sender_email
+        msg['To'] = recipient
+        msg.attach(MIMEText(body, 'html'))
+        messages.append((parseaddr(recipient)[1] or recipient, msg))
+        counts.append(count)
+    errors = (pool or get_smtp_pool()).send(smtp_server, smtp_port, sender_email, sender_password, messages,
+                                            starttls=starttls)
+    return [{"recipient": recipient, "success": error is None, "error": error, "action_items": count}
+            for recipient, error, count in zip(recipients, errors, counts)]
+
+def send_email(smtp_server, smtp_port, sender_email, sender_password, recipients, summary_data, on_error=None):
+    """Send meeting summary via email using provided SMTP credentials. True if every recipient got it."""
+    results = send_summary_emails(smtp_server, smtp_port, sender_email, sender_password, recipients, summary_data)
+    for result in results:
+        if not result["success"]:
+            (on_error or logger.error)(f"Email to {result['recipient']} failed: {result['error']}")
+    return all(result["success"] for result in results)
+
+# --------------------------------------------------------------------
+# Asana Functions (Improved)
+# --------------------------------------------------------------------
+
+ASANA_API_URL = os.getenv("ASANA_API_URL", "https://app.asana.com/api/1.0").rstrip('/')
+ASANA_DIRECTORY_TTL_SECONDS = int(os.getenv("ASANA_DIRECTORY_TTL_SECONDS", "900"))
+ASANA_FUZZY_CUTOFF = 0.8
+ASANA_WORKERS = int(os.getenv("ASANA_WORKERS", "4"))
+ASANA_MAX_RATE_LIMIT_RETRIES = 5
+ASANA_MAX_RETRY_AFTER_SECONDS = 60
+
+def extract_asana_project_id(project_url):
+    """Extract project ID from Asana URL."""
+    # Extract ID from URLs like: https://app.asana.com/0/1209864167784857/1209864173573367
+    pattern = r'asana\.com/\d+/(\d+)'
+    matches = re.search(pattern, project_url)
+    if matches:
+        return matches.group(1)
+    return project_url  # Return as-is if no match (might be direct ID)
+
+def validate_asana_credentials(asana_pat, project_id):
+    """Validate Asana credentials by making a test API call."""
+    if not asana_pat or not project_id:
+        return False, "Missing Asana PAT or Project ID"
+
+    headers = {
+        'Authorization': f'Bearer {asana_pat}',
+        'Accept': 'application/json'
+    }
+
+    # Try to get project details to validate credentials and project ID
+    url = f'{ASANA_API_URL}/projects/{project_id}'
+    try:
+        response = get_http_session("asana").get(url, headers=headers)
+        if response.status_code == 200:
+            return True, "Validated successfully"
+        elif response.status_code == 401:
+            return False, "Invalid Asana Personal Access Token"
+        elif response.status_code == 404:
+            return False, "Project not found. Please check the Project ID"
+        else:
+            return False, f"Asana API error: {response.status_code}"
+    except Exception as e:
+        return False, f"Connection error: {str(e)}"
+
+def get_asana_users(asana_pat, workspace_gid, api_calls=None):
+    """
+    Get list of users in an Asana workspace to map assignees.
+    Follows pagination; each request is counted in api_calls["count"] when given.
+    """
+    headers = {
+        'Authorization': f'Bearer {asana_pat}',
+        'Accept': 'application/json'
+    }
+
+    url = f'{ASANA_API_URL}/workspaces/{workspace_gid}/users'
+    params = {"opt_fields": "name", "limit": 100}
+    users = {}
+    try:
+        while True:
+            response = get_http_session("asana").get(url, headers=headers, params=params)
+            if api_calls is not None:
+                api_calls["count"] = api_calls.get("count", 0) + 1
+            if response.status_code != 200:
+                return users
+            body = response.json()
+            users.update({user['name'].lower(): user['gid'] for user in body.get('data', []) if user.get('name')})
+            next_page = body.get('next_page')
+            if not next_page:
+                return users
+            params = dict(params, offset=next_page['offset'])
+    except Exception:
+        return users
+
+def get_workspace_from_project(asana_pat, project_id, api_calls=None):
+    """Get workspace GID from project ID."""
+    headers = {
+        'Authorization': f'Bearer {asana_pat}',
+        'Accept': 'application/json'
+    }
+
+    url = f'{ASANA_API_URL}/projects/{project_id}'
+    try:
+        response = get_http_session("asana").get(url, headers=headers)
+        if api_calls is not None:
+            api_calls["count"] = api_calls.get("count", 0) + 1
+        if response.status_code == 200:
+            return response.json().get('data', {}).get('workspace', {}).get('gid')
+        return None
+    except Exception:
+        return None
+
+class AsanaDirectory:
+    """
+    Workspace users of an Asana project with a precomputed name index.
+    match() tries, in order: the exact full name, a unique first/last name, a unique
+    prefix of a full name or name part, and finally a fuzzy match on full names.
+    """
+
+    def __init__(self, workspace_gid, users):
+        self.workspace_gid = workspace_gid
+        self.by_name = {normalize_key(name): gid for name, gid in users.items()}
+        self.names = sorted(self.by_name)
+        self.by_part = {}
+        for name, gid in self.by_name.items():
+            for part in name.split():
+                self.by_part.setdefault(part, set()).add(gid)
+        self.parts = sorted(self.by_part)
+
+    def _unique_prefix(self, sorted_keys, lookup, prefix):
+        gids = set()
+        for key in sorted_keys[bisect_left(sorted_keys, prefix):]:
+            if not key.startswith(prefix):
+                break
+            found = lookup[key]
+            gids.update(found if isinstance(found, set) else {found})
+            if len(gids) > 1:
+                return None
+        return gids.pop() if gids else None
+
+    def match(self, assignee_name):
+        name = normalize_key(assignee_name)
+        if not name:
+            return None
+        if name in self.by_name:
+            return self.by_name[name]
+        part_gids = self.by_part.get(name)
+        if part_gids and len(part_gids) == 1:
+            return next(iter(part_gids))
+        gid = (self._unique_prefix(self.names, self.by_name, name)
+               or self._unique_prefix(self.parts, self.by_part, name))
+        if gid:
+            return gid
+        close = difflib.get_close_matches(name, self.names, n=1, cutoff=ASANA_FUZZY_CUTOFF)
+        return self.by_name[close[0]] if close else None
+
+# Stands in for a directory that could not be loaded, so a batch resolves no assignees
+# instead of retrying the workspace lookup for every task
+EMPTY_ASANA_DIRECTORY = AsanaDirectory(None, {})
+
+@lru_cache(maxsize=None)
+def get_asana_directory_cache():
+    """Process-wide {(token hash, project id): (expires_at, AsanaDirectory)} shared across reruns."""
+    return {"lock": threading.Lock(), "entries": {}}
+
+def load_asana_directory(asana_pat, project_id, api_calls=None, cache=None):
+    """
+    Return the AsanaDirectory for a project, fetching the workspace and its users only
+    when there is no unexpired cached copy (ASANA_DIRECTORY_TTL_SECONDS).
+    Returns None if the workspace cannot be resolved.
+    """
+    cache = cache if cache is not None else get_asana_directory_cache()
+    key = (hashlib.sha256(asana_pat.encode()).hexdigest(), project_id)
+    with cache["lock"]:
+        expires_at, directory = cache["entries"].get(key, (0, None))
+        if directory is not None and expires_at > time.time():
+            return directory
+
+    workspace_gid = get_workspace_from_project(asana_pat, project_id, api_calls)
+    if not workspace_gid:
+        return None
+    directory = AsanaDirectory(workspace_gid, get_asana_users(asana_pat, workspace_gid, api_calls))
+    with cache["lock"]:
+        cache["entries"][key] = (time.time() + ASANA_DIRECTORY_TTL_SECONDS, directory)
+    return directory
+
+def retry_after_seconds(retry_after, attempt):
+    """
+    Seconds to wait before retry attempt + 1. Retry-After may be a number of seconds or
+    an HTTP date; when it is missing or unparseable, back off exponentially. Capped at
+    ASANA_MAX_RETRY_AFTER_SECONDS.
+    """
+    delay = None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError, OverflowError):
+                pass
+    if delay is None or math.isnan(delay):
+        delay = 2 ** attempt
+    return min(max(delay, 0.0), ASANA_MAX_RETRY_AFTER_SECONDS)
+
+def is_unassigned(assignee_name):
+    return not assignee_name or assignee_name.strip().lower() in ['', 'n/a', 'none', 'unassigned']
+
+def create_asana_task(asana_pat, project_id, task_name, task_notes=None, assignee_name=None, directory=None,
+                      api_calls=None):
+    """
+    Create one task in an Asana project, assigning it through the (cached) workspace
+    directory when assignee_name matches a user. The directory is loaded when none is
+    given; pass EMPTY_ASANA_DIRECTORY to skip assignment. Returns (success, task_gid or error).
+    """
+    url = f'{ASANA_API_URL}/tasks'
+    headers = {
+        'Authorization': f'Bearer {asana_pat}',
+        'Content-Type': 'application/json'
+    }
+
+    payload = {
+        "data": {
+            "name": task_name,
+            "notes": task_notes or "",
+            "projects": [project_id]
+        }
+    }
+
+    if not is_unassigned(assignee_name):
+        directory = directory or load_asana_directory(asana_pat, project_id, api_calls)
+        assignee_gid = directory.match(assignee_name) if directory else None
+        if assignee_gid:
+            payload["data"]["assignee"] = assignee_gid
+
+    try:
+        # A 429 means the task was not created, so it is safe to resend after Retry-After
+        for attempt in range(ASANA_MAX_RATE_LIMIT_RETRIES + 1):
+            response = get_http_session("asana").post(url, json=payload, headers=headers)
+            if api_calls is not None:
+                api_calls["count"] = api_calls.get("count", 0) + 1
+            if response.status_code != 429 or attempt == ASANA_MAX_RATE_LIMIT_RETRIES:
+                break
+            get_telemetry().inc("http_retries_total", service="asana")
+            time.sleep(retry_after_seconds(response.headers.get('Retry-After'), attempt))
+        response_data = response.json()
+        if response.status_code in [200, 201]:
+            task_data = response_data.get('data', {})
+            return True, task_data.get('gid', 'unknown')
+        else:
+            error_msg = response_data.get('errors', [{}])[0].get('message', 'Unknown error')
+            return False, f"Asana API error: {error_msg}"
+    except Exception as e:
+        return False, f"Asana API exception: {str(e)}"
+
+def asana_task_key(project_id, task_name, task_notes, assignee):
+    """Content hash identifying a task, used to avoid creating the same task twice."""
+    content = json.dumps([project_id, task_name, task_notes, assignee])
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+def process_all_asana_tasks(asana_pat, project_id, action_items, stats=None, created=None, workers=ASANA_WORKERS):
+    """
+    Process all action items as Asana tasks in batch.
+    Tasks are created concurrently on a bounded pool; rate-limited requests wait for
+    Retry-After. Each task is keyed by a content hash, and items whose key already
+    succeeded in `created` (earlier results, e.g. asana_tasks_created) or earlier in this
+    batch are not sent again. The workspace directory is resolved once for the batch; if
+    it cannot be loaded the tasks are created unassigned.
+    stats receives api_calls, seconds, created, skipped and tasks_per_second.
+    """
+    started = time.perf_counter()
+    directory_calls = {}
+    directory = None
+    if any(not is_unassigned(item.get('assignee', '')) for item in action_items):
+        directory = load_asana_directory(asana_pat, project_id, directory_calls) or EMPTY_ASANA_DIRECTORY
+
+    done = {r['key']: r for r in created or [] if r.get('success') and r.get('key')}
+
+    def create(task_name, task_notes, assignee):
+        api_calls = {}
+        task_started = time.perf_counter()
+        success, task_id = create_asana_task(asana_pat, project_id, task_name, task_notes, assignee, directory,
+                                             api_calls)
+        return success, task_id, time.perf_counter() - task_started, api_calls.get("count", 0)
+
+    results = [None] * len(action_items)
+    pending = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for index, item in enumerate(action_items):
+            task_name = item.get('task', 'Untitled Task')
+            assignee = item.get('assignee', '')
+            task_notes = f"Assignee: {assignee}\nAutomatically created from code review meeting."
+            key = asana_task_key(project_id, task_name, task_notes, assignee)
+            results[index] = {"key": key, "task": task_name, "assignee": assignee}
+            if key in done:
+                results[index].update(success=True, task_id=done[key]['task_id'], error=None, skipped=True,
+                                      latency_ms=0.0)
+            elif key in pending.values():
+                results[index].update(success=True, skipped=True, latency_ms=0.0)
+            else:
+                pending[submit_in_context(executor, create, task_name, task_notes, assignee)] = key
+        key_results = {}
+        api_calls = directory_calls.get("count", 0)
+        for future in as_completed(pending):
+            success, task_id, latency, calls = future.result()
+            api_calls += calls
+            key_results[pending[future]] = {
+                "success": success,
+                "task_id": task_id if success else None,
+                "error": task_id if not success else None,
+                "skipped": False,
+                "latency_ms": round(1000 * latency, 1),
+            }
+
+    sent_keys = set()
+    for result in results:
+        outcome = key_results.get(result['key'])
+        if outcome is None:
+            continue
+        if result['key'] in sent_keys:
+            # Duplicate of an item earlier in this batch: share its task
+            result.update(outcome, skipped=True, latency_ms=0.0)
+        else:
+            result.update(outcome)
+            sent_keys.add(result['key'])
+
+    if stats is not None:
+        seconds = time.perf_counter() - started
+        created_count = sum(1 for r in results if r['success'] and not r['skipped'])
+        stats.update(api_calls=api_calls, seconds=round(seconds, 3), created=created_count,
+                     skipped=sum(1 for r in results if r['skipped']),
+                     tasks_per_second=round(created_count / seconds, 2) if seconds else 0.0)
+    return results
+
+# --------------------------------------------------------------------
+# Meeting Archive
+# --------------------------------------------------------------------
+
+ARCHIVE_PAGE_SIZE = int(os.getenv("ARCHIVE_PAGE_SIZE", "20"))
+ARCHIVE_PREVIEW_CHARS = 300
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix, quoted so operators are literal."""
+    words = re.findall(r'\w+', text)
+    return " ".join('"' + word + '"*' for word in words)
+
+class MeetingArchive:
+    """
+    SQLite archive of processed meetings. Transcripts and summary_data are stored
+    zlib-compressed and only decompressed by load(); listing and search read the
+    small metadata columns. Repository and date are indexed columns, assignees have
+    their own indexed table, and summary, decisions, action items and code feedback
+    are searchable through an FTS5 table.
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meetings (
+                id TEXT PRIMARY KEY, created REAL, repo_url TEXT, source TEXT, preview TEXT,
+                action_items INTEGER, code_feedback INTEGER, decisions INTEGER,
+                transcript BLOB, summary_data BLOB);
+            CREATE INDEX IF NOT EXISTS meetings_created ON meetings (created);
+            CREATE INDEX IF NOT EXISTS meetings_repo ON meetings (repo_url, created);
+            CREATE TABLE IF NOT EXISTS meeting_assignees (
+                assignee TEXT, meeting_id TEXT, PRIMARY KEY (assignee, meeting_id)) WITHOUT ROWID;
+            CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5 (
+                id UNINDEXED, summary, decisions, action_items, code_feedback);
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def _pack(value):
+        return zlib.compress(value.encode())
+
+    @staticmethod
+    def _unpack(blob):
+        return zlib.decompress(blob).decode()
+
+    def save(self, meeting_id, transcript, summary_data, repo_url="", source="", created=None):
+        """Insert or replace a meeting with its search index entries."""
+        action_items = [item for item in summary_data.get('action_items') or [] if isinstance(item, dict)]
+        code_feedback = [item for item in summary_data.get('code_feedback') or [] if isinstance(item, dict)]
+        decisions = [str(decision) for decision in summary_data.get('decisions') or []]
+        assignees = {normalize_key(item.get('assignee')) for item in action_items} - {""}
+        summary = str(summary_data.get('summary') or "")
+        with self._lock:
+            self._delete(meeting_id)
+            self._db.execute("INSERT INTO meetings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                meeting_id, created or time.time(), (repo_url or "").rstrip('/'), source,
+                summary[:ARCHIVE_PREVIEW_CHARS], len(action_items), len(code_feedback), len(decisions),
+                self._pack(transcript or ""), self._pack(json.dumps(summary_data))))
+            self._db.executemany("INSERT INTO meeting_assignees VALUES (?, ?)",
+                                 [(assignee, meeting_id) for assignee in assignees])
+            self._db.execute("INSERT INTO meetings_fts VALUES (?, ?, ?, ?, ?)", (
+                meeting_id, summary, "\n".join(decisions),
+                "\n".join(f"{item.get('task', '')} {item.get('assignee', '')}" for item in action_items),
+                "\n".join(f"{item.get('file', '')} {item.get('feedback', '')} {item.get('recommendation', '')}"
+                          for item in code_feedback)))
+            self._db.commit()
+
+    def _delete(self, meeting_id):
+        self._db.execute("DELETE FROM meetings WHERE id = ?", (meeting_id,))
+        self._db.execute("DELETE FROM meeting_assignees WHERE meeting_id = ?", (meeting_id,))
+        self._db.execute("DELETE FROM meetings_fts WHERE id = ?", (meeting_id,))
+
+    def delete(self, meeting_id):
+        with self._lock:
+            self._delete(meeting_id)
+            self._db.commit()
+
+    def search(self, text="", repo_url="", assignee="", since=None, until=None, limit=ARCHIVE_PAGE_SIZE, offset=0):
+        """
+        One page of meetings matching every given filter, newest first, without
+        transcripts or summary_data. since/until are epoch seconds. Returns (rows, total).
+        """
+        where, args = [], []
+        if text and fts_query(text):
+            where.append("id IN (SELECT id FROM meetings_fts WHERE meetings_fts MATCH ?)")
+            args.append(fts_query(text))
+        if repo_url:
+            where.append("repo_url = ?")
+            args.append(repo_url.rstrip('/'))
+        if assignee:
+            where.append("id IN (SELECT meeting_id FROM meeting_assignees WHERE assignee = ?)")
+            args.append(normalize_key(assignee))
+        if since is not None:
+            where.append("created >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("created < ?")
+            args.append(until)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM meetings{clause}", args).fetchone()[0]
+            cursor = self._db.execute(
+                "SELECT id, created, repo_url, source, preview, action_items, code_feedback, decisions "
+                f"FROM meetings{clause} ORDER BY created DESC LIMIT ? OFFSET ?", args + [limit, offset])
+            names = [d[0] for d in cursor.description]
+            rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+        return rows, total
+
+    def load(self, meeting_id):
+        """The full meeting with its transcript and summary_data, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT id, created, repo_url, source, transcript, summary_data "
+                                   "FROM meetings WHERE id = ?", (meeting_id,)).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "created": row[1], "repo_url": row[2], "source": row[3],
+                "text": self._unpack(row[4]), "summary_data": json.loads(self._unpack(row[5]))}
+
+    def repositories(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT DISTINCT repo_url FROM meetings WHERE repo_url != '' ORDER BY repo_url")]
+
+    def assignees(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT DISTINCT assignee FROM meeting_assignees ORDER BY assignee")]
+
+@lru_cache(maxsize=None)
+def get_meeting_archive():
+    """Process-wide meeting archive shared by every session."""
+    return MeetingArchive(os.path.join(APP_CACHE_DIR, "archive.sqlite3"))
+
+# --------------------------------------------------------------------
+# Processing Pipeline
+# --------------------------------------------------------------------
+
+class PipelineProgress:
+    """Receives a run's stage, partial output and warnings; this base only keeps the warnings."""
+
+    def __init__(self):
+        self.warnings = []
+
+    def stage(self, name, progress, detail="", throttle=False):
+        pass
+
+    def partial(self, **values):
+        pass
+
+    def warn(self, message):
+        self.warnings.append(message)
+
+# Stage -> stages whose output it needs; used to find each run's critical path
+PIPELINE_DEPENDENCIES = {"analyze": ["transcribe", "fetch_repo"]}
+
+class StageTimings:
+    """Thread-safe record of when each pipeline stage started and ended, relative to the run start."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter() - self.started
+        try:
+            with get_telemetry().span(f"stage.{name}"):
+                yield
+        finally:
+            end = time.perf_counter() - self.started
+            with self._lock:
+                self.stages[name] = {"start": round(start, 3), "end": round(end, 3), "seconds": round(end - start, 3)}
+            get_telemetry().observe("stage_duration_seconds", end - start, stage=name)
+
+    def critical_path(self):
+        """Walk back from the last stage to finish through its latest-finishing dependency."""
+        if not self.stages:
+            return []
+        name = max(self.stages, key=lambda n: self.stages[n]["end"])
+        path = [name]
+        while True:
+            deps = [d for d in PIPELINE_DEPENDENCIES.get(name, []) if d in self.stages]
+            if not deps:
+                return path[::-1]
+            name = max(deps, key=lambda d: self.stages[d]["end"])
+            path.append(name)
+
+    def report(self):
+        return {
+            "stages": [dict(stage=n, **t) for n, t in sorted(self.stages.items(), key=lambda item: item[1]["start"])],
+            "critical_path": self.critical_path(),
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+        }
+
+def fetch_repository_stage(job, inputs):
+    """Fetch and index the repository for a job. Returns (files_dict, file_index, fetch_info)."""
+    file_timings = []
+
+    def on_file_fetched(done, total, path, seconds):
+        file_timings.append({"file": path, "seconds": round(seconds, 3)})
+        job.partial(fetch=f"Fetched {done}/{total} files")
+
+    fetch_started = time.perf_counter()
+    repo_cache = inputs["repo_cache"]
+    snapshot = {}
+    prefetched = inputs.get("prefetched")
+    files_dict, err = get_github_files(inputs["repo_url"], inputs["branch"], inputs["github_token"],
+                                       on_file_fetched, repo_cache, snapshot,
+                                       previous=prefetched[:2] if prefetched else None)
+    if err:
+        job.warn(err)
+        return {}, {}, None
+    fetch_seconds = time.perf_counter() - fetch_started
+    index_started = time.perf_counter()
+    if prefetched and files_dict is prefetched[1]:
+        # Branch unchanged since the previous run: its index is still valid
+        file_index = prefetched[2]
+    else:
+        file_index = build_file_indexes(files_dict)
+    return files_dict, file_index, {
+        "seconds": round(fetch_seconds, 2),
+        "index_seconds": round(time.perf_counter() - index_started, 2),
+        "files": len(files_dict),
+        "downloaded": len(file_timings),
+        "slowest": sorted(file_timings, key=lambda t: t["seconds"], reverse=True)[:50],
+        "cache": repo_cache.stats(),
+        "snapshot": snapshot,
+    }
+
+def run_processing_job(job, inputs):
+    """
+    Extract audio, transcribe, fetch the repository and analyze, reporting each stage
+    to job (a PipelineProgress). The repository fetch runs on its own thread while the
+    audio is decoded and transcribed; both are joined before analysis. inputs may carry
+    "prefetched" (snapshot, files_dict, file_index) from an earlier run, reused when the
+    branch still points at the same commit, and "segment_memo" from an earlier run of the
+    same meeting to re-analyze only changed segments. Returns
+    (result, files_dict, file_index) where result is JSON-serializable and includes
+    per-stage timings and the trace_id of the run's spans.
+    """
+    timings = StageTimings()
+    with get_telemetry().span("pipeline.run", audio=inputs["uploaded_file"] is not None,
+                              repository=bool(inputs["repo_url"])) as run_span:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch") as executor:
+            fetch_future = None
+            if inputs["repo_url"]:
+                def fetch():
+                    with timings.stage("fetch_repo"):
+                        return fetch_repository_stage(job, inputs)
+                fetch_future = submit_in_context(executor, fetch)
+
+            text = inputs["direct_text"]
+            if inputs["uploaded_file"] is not None:
+                job.stage("transcribing", 0.05, "Extracting and transcribing audio")
+                with timings.stage("transcribe"):
+                    audio_blocks = extract_audio(inputs["uploaded_file"], on_error=job.warn)
+                    if audio_blocks is None:
+                        raise RuntimeError(job.warnings[-1])
+                    text = speech_to_text(audio_blocks, lambda partial: job.partial(transcript=partial),
+                                          inputs["backend"], on_error=job.warn)
+
+            if fetch_future is None:
+                files_dict, file_index, fetch = {}, {}, None
+            if fetch_future is not None:
+                job.stage("fetching", 0.5, "Waiting for repository fetch")
+                files_dict, file_index, fetch = fetch_future.result()
+
+        job.stage("analyzing", 0.6, "Analyzing transcript")
+        token_usage = {}
+        segment_memo = dict(inputs.get("segment_memo") or {})
+        with timings.stage("analyze"):
+            summary_data = analyze_with_groq(text, files_dict, token_usage, cache=inputs["llm_cache"],
+                                             on_partial=lambda partial: job.partial(analysis=partial),
+                                             on_error=job.warn, segment_memo=segment_memo)
+    result = {"text": text, "summary_data": summary_data, "token_usage": token_usage, "fetch": fetch,
+              "timings": timings.report(), "warnings": job.warnings, "trace_id": run_span["trace_id"],
+              "segments": segment_memo}
+    return result, files_dict, file_index
+
+PIPELINE_IMPORT_SECONDS = round(time.perf_counter() - PIPELINE_IMPORT_STARTED, 3)